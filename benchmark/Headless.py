@@ -0,0 +1,51 @@
+"""
+Helpers for running game code without a real display
+"""
+import os
+
+
+def set_dummy_drivers():
+    """
+    Selects SDL dummy drivers. Must be called before pygame is initialised
+    :return:
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+
+def init_pygame(screen_size=(1024, 768)):
+    """
+    Initialise pygame with dummy video driver. Display mode is still set,
+    because loading animations and maps converts surfaces to display format
+    :param screen_size:
+    :return: display surface
+    """
+    set_dummy_drivers()
+    import pygame
+    pygame.init()
+    return pygame.display.set_mode(screen_size)
+
+
+class HeadlessApp:
+    """
+    Application replacement for running phases without main loop. Phase
+    changes are only recorded
+    """
+
+    def __init__(self):
+        from pytowerdefence.GarbageCollection import GcMonitor
+        self.phase = None
+        self.sampling_profiler = None
+        self.sampling_mode = 'hotkey'
+        self.gc_monitor = GcMonitor()
+        self.gc_policy = None
+
+    def set_phase(self, phase_type, **kwargs):
+        """
+        Records requested phase
+        :param phase_type:
+        :param kwargs:
+        :return:
+        """
+        self.phase = phase_type
@@ -0,0 +1,183 @@
+"""
+Measures input handling of game phase under high rate mouse: mouse motion
+events are posted from separate thread (like 1000 Hz mouse) while App runs
+its profiled frames with SDL dummy drivers. Reported are hover/placement
+queries per frame, time of event processing and input-to-visual latency:
+time from posting event to the end of flip of frame which processed it.
+
+Run from repository root:
+    python -m benchmark.InputBenchmark --output input.json
+    python -m benchmark.InputBenchmark --compare input.json
+"""
+import argparse
+import math
+import sys
+import threading
+import time
+
+from benchmark import Results
+from benchmark.Headless import init_pygame
+from benchmark.RenderBenchmark import place_monsters, LEVEL_FILE
+from benchmark.SimulationBenchmark import place_towers, SCREEN_SIZE
+
+MONSTERS = 100
+TOWERS = 20
+MODES = ('hover', 'placement')
+
+
+class MousePoster(threading.Thread):
+    """
+    Posts mouse motion events moving along circle, with time of posting
+    """
+
+    def __init__(self, rate):
+        super().__init__(daemon=True)
+        self.rate = rate
+        self.running = True
+
+    def run(self):
+        import pygame
+
+        center = (SCREEN_SIZE[0] / 2, SCREEN_SIZE[1] / 2)
+        previous = center
+        index = 0
+        while self.running:
+            angle = index * 0.01
+            pos = (int(center[0] + 300 * math.cos(angle)),
+                   int(center[1] + 200 * math.sin(angle)))
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEMOTION, pos=pos, buttons=(0, 0, 0),
+                rel=(pos[0] - previous[0], pos[1] - previous[1]),
+                posted=time.perf_counter()))
+            previous = pos
+            index += 1
+            time.sleep(1. / self.rate)
+
+
+class QueryCounter:
+    """
+    Counts calls of level queries
+    """
+
+    def __init__(self, level, names):
+        self.calls = 0
+        for name in names:
+            setattr(level, name, self._counted(getattr(level, name)))
+
+    def _counted(self, function):
+        def wrapper(*args, **kwargs):
+            self.calls += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+
+def create_app(mode):
+    """
+    Creates App in game phase with monsters and towers on level
+    :param mode: hover (default scrolling action) or placement (adding tower)
+    :return: app and query counter
+    """
+    from pytowerdefence.App import App
+    from pytowerdefence.Profiler import FrameProfiler
+
+    app = App(profiler=FrameProfiler())
+    app.on_init()
+    app.set_phase('game', filename=LEVEL_FILE)
+    phase = app._current_phase
+    level, factory = phase.level, phase._creatures_factory
+    place_towers(level, factory, TOWERS)
+    place_monsters(level, factory, MONSTERS)
+    counter = QueryCounter(level, ['get_actor_on_position',
+                                   'is_rectangle_colliding'])
+    if mode == 'placement':
+        phase._logic_manager.game_state.player_gold = 10 ** 6
+        action_manager = phase._action_manager
+        action_manager.start_action(
+            action_manager.create_action('AddTower', tower='Bandit'),
+            mouse_pos=(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2))
+    return app, counter
+
+
+def measure(mode, frames, rate):
+    """
+    Runs frames of App while mouse events are posted
+    :param mode:
+    :param frames:
+    :param rate: mouse events per second
+    :return:
+    """
+    import pygame
+    from pytowerdefence.Profiler import percentile
+
+    app, counter = create_app(mode)
+    latencies = []
+    polled = []
+    original_get = pygame.event.get
+
+    def get_events(*args, **kwargs):
+        events = original_get(*args, **kwargs)
+        polled.extend(getattr(event, 'posted', None) for event in events)
+        return events
+
+    pygame.event.get = get_events
+    poster = MousePoster(rate)
+    clock = pygame.time.Clock()
+    queries = 0
+    try:
+        original_get()
+        poster.start()
+        for _ in range(frames):
+            del polled[:]
+            calls = counter.calls
+            app._profiled_frame(clock)
+            end = time.perf_counter()
+            queries += counter.calls - calls
+            latencies.extend(end - posted for posted in polled
+                             if posted is not None)
+    finally:
+        poster.running = False
+        poster.join()
+        pygame.event.get = original_get
+        # pygame stays initialised, cached fonts would not survive quit
+        app.gc_monitor.uninstall()
+
+    summary = app._profiler.summary()
+    latencies.sort()
+    return {
+        'queries_per_frame': queries / frames,
+        'events_ms': summary['events']['mean'] * 1000.,
+        'frame_p50_ms': summary['total']['p50'] * 1000.,
+        'latency_p50_ms': percentile(latencies, 50) * 1000.,
+        'latency_p99_ms': percentile(latencies, 99) * 1000.,
+    }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Input handling benchmark with high rate mouse")
+    parser.add_argument('--frames', type=int, default=300,
+                        help="measured frames per mode")
+    parser.add_argument('--rate', type=int, default=1000,
+                        help="mouse motion events per second")
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    init_pygame(SCREEN_SIZE)
+
+    results = {}
+    for mode in MODES:
+        result = measure(mode, arguments.frames, arguments.rate)
+        results[mode] = result
+        print("{0:<10} queries/frame {queries_per_frame:6.2f}  events "
+              "{events_ms:6.3f} ms  frame p50 {frame_p50_ms:6.2f} ms  "
+              "latency p50/p99 {latency_p50_ms:6.2f}/{latency_p99_ms:6.2f} "
+              "ms".format(mode, **result))
+
+    return Results.finish(arguments, 'input', results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+Reports memory used per instance of game objects on headless level, broken
+down into animations/surfaces, statistics, controllers and callbacks, and
+checks that actors killed in a wave are freed.
+
+Size of instance is deep size of objects it owns: everything reachable from
+it except other game objects, level structures, classes and functions.
+Objects shared between instances (class properties, interned values) are
+counted only once, so first instance of every type is measured as warmup and
+the rest is averaged. Pixel memory of surfaces is included.
+
+Run from repository root:
+    python -m benchmark.MemoryReport
+    python -m benchmark.MemoryReport --instances 50 --output memory.json
+"""
+import argparse
+import gc
+import sys
+import weakref
+from enum import Enum
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+from benchmark import Results
+from benchmark.Headless import init_pygame
+from benchmark.SimulationBenchmark import Scenario, Simulation, \
+    SCREEN_SIZE, place_towers
+
+CATEGORIES = ('object', 'animations', 'statistics', 'controllers',
+              'callbacks')
+SLOT_CATEGORIES = {
+    '_animations': 'animations',
+    '_current_animation': 'animations',
+    '_evolution_animations': 'animations',
+    'image': 'animations',
+    '_sprite': 'animations',
+    '_rotated_source': 'animations',
+    '_base_statistics': 'statistics',
+    '_statistics': 'statistics',
+    '_statistic_modifiers': 'statistics',
+    '_modifiers': 'statistics',
+    '_evolution_statistics': 'statistics',
+    '_evolution_costs': 'statistics',
+    '_logical_effects': 'statistics',
+    '_controllers': 'controllers',
+    '_prev_updated_controller': 'controllers',
+    '_ai': 'controllers',
+    '_callbacks': 'callbacks',
+    '_trackers': 'callbacks',
+}
+SETTLE_TICKS = 120
+MAX_WAVE_TICKS = 60 * 60
+
+
+def object_size(obj):
+    """
+    Size of object itself, including its __dict__ when it holds anything.
+    Reading __dict__ of slotted object creates an empty one, so empty
+    dictionary is not counted
+    :param obj:
+    :return:
+    """
+    size = sys.getsizeof(obj)
+    attributes = getattr(obj, '__dict__', None)
+    if attributes:
+        size += sys.getsizeof(attributes)
+    return size
+
+
+def not_owned_types():
+    """
+    Types of objects which are never owned by measured instance
+    :return:
+    """
+    from pygame.sprite import AbstractGroup
+    from pytowerdefence.gameplay.Navigation import ArcLengthPath, FlowField
+    from pytowerdefence.gameplay.Objects import GameObject
+    from pytowerdefence.gameplay.Scene import Level
+    return (type, ModuleType, FunctionType, BuiltinFunctionType, Enum,
+            GameObject, AbstractGroup, Level, ArcLengthPath, FlowField)
+
+
+def deep_size(roots, seen):
+    """
+    Size of objects reachable from roots. Objects in seen are skipped and
+    visited objects are added to it. Bound methods are counted without
+    their owners
+    :param roots:
+    :param seen: set of ids of already counted objects
+    :return:
+    """
+    import pygame
+
+    stop_types = not_owned_types()
+    size = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, stop_types):
+            continue
+        seen.add(id(obj))
+        size += object_size(obj)
+        if isinstance(obj, MethodType):
+            continue
+        if isinstance(obj, pygame.Surface):
+            parent = obj.get_parent()
+            if parent is None:
+                size += obj.get_pitch() * obj.get_height()
+            else:
+                stack.append(parent)
+            continue
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def slots_of(obj):
+    """
+    Returns names of all slots of object
+    :param obj:
+    :return:
+    """
+    names = []
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return [name for name in names if hasattr(obj, name)]
+
+
+def size_by_category(obj, seen):
+    """
+    Deep size of game object broken down into categories
+    :param obj:
+    :param seen:
+    :return: dictionary category -> bytes
+    """
+    seen.add(id(obj))
+    sizes = dict.fromkeys(CATEGORIES, 0)
+    sizes['object'] = object_size(obj)
+    slots = slots_of(obj)
+    for category in CATEGORIES[1:] + CATEGORIES[:1]:
+        roots = [getattr(obj, name) for name in slots
+                 if SLOT_CATEGORIES.get(name, 'object') == category]
+        sizes[category] += deep_size(roots, seen)
+    return sizes
+
+
+def average_sizes(objects, measure):
+    """
+    Average size of instances except first one, which holds shared objects
+    :param objects:
+    :param measure: function(obj, seen) returning dictionary of sizes
+    :return: dictionary of average sizes with total
+    """
+    seen = set()
+    measure(objects[0], seen)
+    totals = {}
+    for obj in objects[1:]:
+        for category, size in measure(obj, seen).items():
+            totals[category] = totals.get(category, 0) + size
+    averages = {category: size / (len(objects) - 1)
+                for category, size in totals.items()}
+    averages['total'] = sum(averages.values())
+    return averages
+
+
+def effect_size(effect, seen):
+    """
+    Deep size of logical effect with its modifiers
+    :param effect:
+    :param seen:
+    :return:
+    """
+    return {'object': deep_size([effect], seen)}
+
+
+def populate_level(instances):
+    """
+    Creates headless level with instances of every monster type, towers
+    shooting at them and logical effects applied
+    :param instances: number of instances of each type
+    :return: simulation
+    """
+    from benchmark.RenderBenchmark import place_monsters
+    from pytowerdefence.gameplay.Objects import add_effect_to_actor
+
+    simulation = Simulation(Scenario('memory', monsters=0, towers=0))
+    level, factory = simulation.level, simulation.factory
+    monsters = place_monsters(level, factory, instances, 'Ogre') \
+        + place_monsters(level, factory, instances, 'Dragon')
+    place_towers(level, factory, instances, 'Bandit')
+    place_towers(level, factory, instances, 'Base')
+    simulation.run(SETTLE_TICKS)
+    for monster in monsters:
+        add_effect_to_actor('SlowEffect', monster, time=60, percent=0.5)
+        add_effect_to_actor('HitEffect', monster, damage=0)
+    return simulation
+
+
+def collect_report(instances):
+    """
+    Returns average bytes per instance of every type, by category
+    :param instances: number of instances of each type, at least 2
+    :return:
+    """
+    from pytowerdefence.gameplay.Objects import Actor, Bullet
+
+    simulation = populate_level(instances)
+    objects = {}
+    for sprite in simulation.level.group:
+        if isinstance(sprite, (Actor, Bullet)):
+            objects.setdefault(type(sprite).__name__, []).append(sprite)
+    for actor in list(objects.get('Ogre', [])) + objects.get('Dragon', []):
+        for effect in actor.logical_effects:
+            objects.setdefault(type(effect).__name__, []).append(effect)
+
+    report = {}
+    for name, instances_ in sorted(objects.items()):
+        if len(instances_) < 2:
+            continue
+        measure = size_by_category if name in ('Ogre', 'Dragon', 'Bandit',
+                                               'Base', 'Bullet') \
+            else effect_size
+        report[name] = average_sizes(instances_, measure)
+    return report
+
+
+def kill_all(references):
+    """
+    Kills living actors
+    :param references: weak references to actors
+    :return:
+    """
+    for reference in references:
+        actor = reference()
+        if actor is not None and actor.alive and actor.hp >= 0:
+            actor.hit(actor.hp + 1)
+
+
+def check_leaks(monsters):
+    """
+    Runs wave of monsters against towers, kills survivors and checks that
+    all monsters and bullets are freed once removed from level
+    :param monsters: number of monsters in wave
+    :return: dictionary of counts
+    """
+    from pytowerdefence.gameplay.Objects import Actor, Bullet, ENEMY_TEAM
+
+    simulation = Simulation(Scenario('leaks', monsters=monsters, towers=12))
+    level = simulation.level
+    tracked = {'monsters': {}, 'bullets': {}}
+
+    def track():
+        for sprite in level.group:
+            if isinstance(sprite, Bullet):
+                group = tracked['bullets']
+            elif isinstance(sprite, Actor) and sprite.team == ENEMY_TEAM \
+                    and sprite is not level.base:
+                group = tracked['monsters']
+            else:
+                continue
+            if id(sprite) not in group:
+                group[id(sprite)] = weakref.ref(sprite)
+
+    def enemies_left():
+        return any(reference() is not None and reference().alive
+                   for reference in tracked['monsters'].values())
+
+    ticks = 0
+    while ticks == 0 or simulation.wave_manager.is_spawning():
+        simulation.run(1)
+        track()
+        ticks += 1
+    kill_all(tracked['monsters'].values())
+    while enemies_left() and ticks < MAX_WAVE_TICKS:
+        simulation.run(1)
+        track()
+        ticks += 1
+    simulation.run(SETTLE_TICKS)
+
+    result = {}
+    for name, group in tracked.items():
+        alive = sum(reference() is not None for reference in group.values())
+        gc.collect()
+        leaked = [reference() for reference in group.values()
+                  if reference() is not None]
+        result[name] = {
+            'created': len(group),
+            'freed_by_refcount': len(group) - alive,
+            'freed_by_gc': alive - len(leaked),
+            'leaked': len(leaked),
+        }
+        if leaked:
+            result[name]['leak_referrers'] = sorted({
+                type(referrer).__name__
+                for referrer in gc.get_referrers(*leaked)
+                if referrer is not leaked})
+        del leaked
+    return result
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Memory footprint per entity type and leak check")
+    parser.add_argument('--instances', type=int, default=20,
+                        help="instances of each type (at least 2)")
+    parser.add_argument('--wave', type=int, default=100,
+                        help="monsters in leak check wave")
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    init_pygame(SCREEN_SIZE)
+
+    report = collect_report(max(arguments.instances, 2))
+    print("{0:<14}".format('bytes') + ''.join(
+        "{0:>13}".format(category) for category in CATEGORIES + ('total',)))
+    for name, sizes in report.items():
+        print("{0:<14}".format(name) + ''.join(
+            "{0:>13.0f}".format(sizes.get(category, 0))
+            for category in CATEGORIES + ('total',)))
+
+    leaks = check_leaks(arguments.wave)
+    for name, counts in leaks.items():
+        print("{0:<10} created {created:>5}  freed by refcount "
+              "{freed_by_refcount:>5}  freed by gc {freed_by_gc:>5}  "
+              "leaked {leaked:>5}  {1}".format(
+                  name, ', '.join(counts.get('leak_referrers', [])),
+                  **counts))
+
+    results = {'bytes_per_instance': report,
+               'leaks': {name: {key: value for key, value in counts.items()
+                                if key != 'leak_referrers'}
+                         for name, counts in leaks.items()}}
+    return Results.finish(arguments, 'memory', results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
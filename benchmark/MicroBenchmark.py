@@ -0,0 +1,236 @@
+"""
+Micro-benchmarks of gameplay hot functions. Every case runs fixed number of
+warmup calls and repeats; fastest repeat is reported as ns/op.
+
+CPython has no counter of all allocations, so two allocation metrics are
+reported: peak traced memory of single call (tracemalloc) and number of
+memory blocks retained per call (sys.getallocatedblocks). Memory of SDL
+surfaces is not traced.
+
+Run from repository root:
+    python -m benchmark.MicroBenchmark --output micro.json
+    python -m benchmark.MicroBenchmark --compare micro.json
+"""
+import argparse
+import itertools
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmark import Results
+from benchmark.Headless import init_pygame
+
+WARMUP = 100
+REPEAT = 7
+FAR_AWAY = 10 ** 6
+
+
+class Case:
+    """
+    Benchmark case. Setup returns operation called without arguments
+    """
+
+    def __init__(self, name, setup, number=1000):
+        self.name = name
+        self.setup = setup
+        self.number = number
+
+
+def setup_rot_center():
+    from pytowerdefence.Resource import ResourceManager, ResourceClass
+    from pytowerdefence.Utils import rot_center
+
+    frame = ResourceManager.load_animation(
+        ResourceClass.CHARACTERS, 'ogre-move.json').getCurrentFrame()
+    angles = itertools.cycle(range(0, 360, 7))
+    return lambda: rot_center(frame, next(angles))
+
+
+def setup_is_visible():
+    from pygame.math import Vector2
+    from pytowerdefence.gameplay.Monsters import Ogre, Bandit
+    from pytowerdefence.gameplay.Scene import is_visible
+
+    tower, monster = Bandit(), Ogre()
+    monster.position = Vector2(50, 0)
+    return lambda: is_visible(tower, monster)
+
+
+def create_modifiers():
+    """
+    Modifiers of monster hit by two slowing towers
+    :return:
+    """
+    from pytowerdefence.gameplay.Objects import StatisticModifier, \
+        StatisticType
+    return [StatisticModifier(StatisticType.SPEED, 0.5, multiply=True),
+            StatisticModifier(StatisticType.SPEED, 0.8, multiply=True)]
+
+
+def setup_get_modified_statistics():
+    from pytowerdefence.gameplay.Monsters import Ogre
+
+    statistics_ = Ogre().base_statistics
+    modifiers = create_modifiers()
+    return lambda: statistics_.get_modified_statistics(modifiers)
+
+
+def setup_categorized_modifiers():
+    from pytowerdefence.gameplay.Objects import categorized_modifiers
+
+    modifiers = create_modifiers()
+    return lambda: categorized_modifiers(modifiers)
+
+
+def setup_load_animation():
+    from pytowerdefence.Resource import ResourceManager, ResourceClass
+
+    return lambda: ResourceManager.load_animation(ResourceClass.CHARACTERS,
+                                                  'ogre-move.json')
+
+
+def setup_create_effect():
+    from pytowerdefence.gameplay.Monsters import Ogre
+    from pytowerdefence.gameplay.Objects import create_effect
+
+    monster = Ogre()
+    return lambda: create_effect('HitEffect', monster, damage=1)
+
+
+def setup_bullet_update():
+    from pygame.math import Vector2
+    from pytowerdefence.gameplay.Monsters import Ogre, Bandit
+    from pytowerdefence.gameplay.Objects import Bullet
+
+    tower, monster = Bandit(), Ogre()
+    monster.position = Vector2(FAR_AWAY, 0)
+    bullet = Bullet(tower)
+    bullet.target = monster
+    return lambda: bullet.update(0.001)
+
+
+def setup_path_controller_update():
+    from pytowerdefence.gameplay.Controllers import PathController
+    from pytowerdefence.gameplay.Monsters import Ogre
+
+    monster = Ogre()
+    controller = monster.get_controller(PathController)
+    controller.set_path([(index * 100, (index % 2) * 100)
+                         for index in range(FAR_AWAY // 100)])
+    return lambda: controller.update(1. / 60.)
+
+
+def setup_text_update():
+    from pytowerdefence.UI import Text
+
+    text = Text("")
+    values = itertools.cycle(str(gold) for gold in range(100, 120))
+    return lambda: setattr(text, 'text', next(values))
+
+
+CASES = [
+    Case('Utils.rot_center', setup_rot_center),
+    Case('Scene.is_visible', setup_is_visible, 10000),
+    Case('ActorStatistics.get_modified_statistics',
+         setup_get_modified_statistics),
+    Case('categorized_modifiers', setup_categorized_modifiers, 10000),
+    Case('ResourceManager.load_animation', setup_load_animation, 20),
+    Case('Objects.create_effect', setup_create_effect, 10000),
+    Case('Bullet.update', setup_bullet_update, 10000),
+    Case('PathController.update', setup_path_controller_update, 10000),
+    Case('Text.text', setup_text_update, 10000),
+]
+
+
+def measure_time(operation, number, warmup=WARMUP, repeat=REPEAT):
+    """
+    Returns fastest and median time of operation in nanoseconds
+    :param operation:
+    :param number: calls per repeat
+    :param warmup: calls before measurement
+    :param repeat:
+    :return:
+    """
+    for _ in range(min(warmup, number)):
+        operation()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        times.append((time.perf_counter() - start) * 1e9 / number)
+    return min(times), statistics.median(times)
+
+
+def measure_allocations(operation, number):
+    """
+    Returns average peak of traced memory of single call in bytes and
+    average number of memory blocks retained by call
+    :param operation:
+    :param number:
+    :return:
+    """
+    blocks = sys.getallocatedblocks()
+    for _ in range(number):
+        operation()
+    retained = (sys.getallocatedblocks() - blocks) / number
+
+    tracemalloc.start()
+    peaks = 0
+    for _ in range(number):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation()
+        peaks += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return peaks / number, retained
+
+
+def run_case(case):
+    """
+    Measures case
+    :param case:
+    :return:
+    """
+    operation = case.setup()
+    fastest, median = measure_time(operation, case.number)
+    peak_bytes, retained_blocks = measure_allocations(operation, case.number)
+    return {
+        'ns_per_op': fastest,
+        'median_ns_per_op': median,
+        'peak_bytes_per_op': peak_bytes,
+        'retained_blocks_per_op': retained_blocks,
+    }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks of gameplay hot functions")
+    parser.add_argument('--case', action='append',
+                        choices=[case.name for case in CASES],
+                        help="run only selected cases")
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    init_pygame()
+
+    results = {}
+    print("{0:<42}{1:>14}{2:>14}{3:>12}".format(
+        'case', 'ns/op', 'peak B/op', 'blocks/op'))
+    for case in CASES:
+        if arguments.case and case.name not in arguments.case:
+            continue
+        result = run_case(case)
+        results[case.name] = result
+        print("{0:<42}{ns_per_op:>14.0f}{peak_bytes_per_op:>14.1f}"
+              "{retained_blocks_per_op:>12.2f}".format(case.name, **result))
+
+    return Results.finish(arguments, 'micro', results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
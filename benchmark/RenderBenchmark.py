@@ -0,0 +1,208 @@
+"""
+Measures rendering of game phase (test.tmx map, sprites, UI) into offscreen
+surface with SDL dummy video driver, for increasing sprite counts.
+
+Run from repository root:
+    python -m benchmark.RenderBenchmark --output render.json
+    python -m benchmark.RenderBenchmark --compare render.json
+"""
+import argparse
+import sys
+import time
+
+from benchmark import Results
+from benchmark.Headless import init_pygame, HeadlessApp
+from benchmark.SimulationBenchmark import place_towers, SCREEN_SIZE
+
+LEVEL_FILE = 'data/maps/1.json'
+SPRITE_COUNTS = (0, 50, 200, 500)
+TOWERS_PER_SPRITES = 10
+SCROLL_SPEED = 8
+CALLS = 2000
+
+
+def place_monsters(level, factory, count, name='Ogre'):
+    """
+    Places monsters evenly along level paths
+    :param level:
+    :param factory:
+    :param count:
+    :param name:
+    :return: list of monsters
+    """
+    monsters = []
+    for index in range(count):
+        path = level.paths[index % len(level.paths)]
+        monster = factory.create(name)
+        monster.position = path.position_at(
+            path.length * (index + 1) / (count + 1))
+        level.add(monster)
+        monsters.append(monster)
+    return monsters
+
+
+class RenderScene:
+    """
+    Game phase with given number of monsters and towers, rendered into
+    offscreen surface
+    """
+
+    def __init__(self, sprites):
+        from pytowerdefence.UI import UIManager
+        from pytowerdefence.gameplay.GamePhase import GamePhase
+        from pytowerdefence.gameplay.Graphics import AttackRangeDrawer, \
+            HealthDrawer
+        from pytowerdefence.gameplay.Scene import Camera
+
+        import pygame
+        self.surface = pygame.Surface(SCREEN_SIZE).convert()
+        self.ui_manager = UIManager(SCREEN_SIZE)
+        self.phase = GamePhase(HeadlessApp(), self.ui_manager)
+        self.phase.initialise(filename=LEVEL_FILE)
+        self.level = self.phase.level
+
+        factory = self.phase._creatures_factory
+        towers = place_towers(self.level, factory,
+                              sprites // TOWERS_PER_SPRITES)
+        self.monsters = place_monsters(self.level, factory,
+                                       sprites - len(towers))
+        self.level.update_objects(0.)
+        self.range_drawers = [AttackRangeDrawer(tower) for tower in towers]
+        self.health_drawers = [HealthDrawer(monster)
+                               for monster in self.monsters]
+
+        self._center = pygame.math.Vector2(SCREEN_SIZE) / 2
+        self._scroll = pygame.math.Vector2(SCROLL_SPEED, SCROLL_SPEED / 2)
+        map_data = self.level.map_data
+        self._map_size = (map_data.map_size[0] * map_data.tile_size[0],
+                          map_data.map_size[1] * map_data.tile_size[1])
+        Camera.set_position(self._center)
+
+    def draw(self, overlays=False):
+        """
+        Draws one frame
+        :param overlays: draws range overlays and health bars
+        :return:
+        """
+        self.level.draw(self.surface)
+        if overlays:
+            for drawer in self.range_drawers:
+                drawer.draw(self.surface)
+            for drawer in self.health_drawers:
+                drawer.draw(self.surface)
+        self.ui_manager.draw(self.surface)
+
+    def scroll(self):
+        """
+        Moves camera, bouncing from map borders
+        :return:
+        """
+        from pytowerdefence.gameplay.Scene import Camera
+
+        for axis in range(2):
+            half = SCREEN_SIZE[axis] / 2
+            if not half <= self._center[axis] + self._scroll[axis] \
+                    <= self._map_size[axis] - half:
+                self._scroll[axis] = -self._scroll[axis]
+        self._center += self._scroll
+        Camera.set_position(self._center)
+
+
+def measure_fps(scene, frames, scrolling=False, overlays=False):
+    """
+    Renders frames and returns frames per second
+    :param scene:
+    :param frames:
+    :param scrolling:
+    :param overlays:
+    :return:
+    """
+    start = time.perf_counter()
+    for _ in range(frames):
+        if scrolling:
+            scene.scroll()
+        scene.draw(overlays)
+    return frames / (time.perf_counter() - start)
+
+
+def per_call_us(function, calls=CALLS):
+    """
+    Returns average time of call in microseconds
+    :param function:
+    :param calls:
+    :return:
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def measure_calls(scene):
+    """
+    Measures costs of single draw operations
+    :param scene:
+    :return:
+    """
+    from pytowerdefence.Utils import rot_center
+
+    monster = scene.monsters[0]
+    frame = monster._current_animation.getCurrentFrame()
+    map_layer = scene.level.map_layer
+    angles = iter(range(10 ** 9))
+    return {
+        'blit_us': per_call_us(
+            lambda: scene.surface.blit(monster.image, (100, 100))),
+        'rotate_us': per_call_us(
+            lambda: rot_center(frame, next(angles) % 360)),
+        'pyscroll_draw_us': per_call_us(
+            lambda: map_layer.draw(scene.surface, scene.surface.get_rect()),
+            CALLS // 10),
+        'pyscroll_redraw_us': per_call_us(
+            lambda: map_layer.redraw_tiles(scene.surface), CALLS // 10),
+    }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Rendering benchmark with SDL dummy video driver")
+    parser.add_argument('--frames', type=int, default=300,
+                        help="rendered frames per measurement")
+    parser.add_argument('--sprites', type=int, action='append',
+                        help="sprite counts to measure (default: {0})".format(
+                            ', '.join(map(str, SPRITE_COUNTS))))
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    init_pygame(SCREEN_SIZE)
+
+    results = {}
+    for sprites in arguments.sprites or SPRITE_COUNTS:
+        scene = RenderScene(sprites)
+        result = {
+            'static_fps': measure_fps(scene, arguments.frames),
+            'scrolling_fps': measure_fps(scene, arguments.frames,
+                                         scrolling=True),
+            'overlays_fps': measure_fps(scene, arguments.frames,
+                                        overlays=True),
+        }
+        results['sprites_{0}'.format(sprites)] = result
+        print("{0:>5} sprites  static {static_fps:8.1f} fps  scrolling "
+              "{scrolling_fps:8.1f} fps  overlays {overlays_fps:8.1f} "
+              "fps".format(sprites, **result))
+
+    scene = RenderScene(1)
+    results['calls'] = measure_calls(scene)
+    for name, value in results['calls'].items():
+        print("{0:<20}{1:>10.2f} us".format(name, value))
+
+    return Results.finish(arguments, 'render', results,
+                          higher_is_better={'static_fps', 'scrolling_fps',
+                                            'overlays_fps'})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
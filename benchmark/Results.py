@@ -0,0 +1,148 @@
+"""
+Storing benchmark results as JSON and comparing them with baseline
+"""
+import json
+import platform
+import time
+
+
+def add_arguments(parser):
+    """
+    Adds common output and comparison arguments to parser
+    :param parser:
+    :return:
+    """
+    parser.add_argument('--output', metavar='PATH',
+                        help="store results as JSON")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="compare results with stored baseline")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="relative change treated as regression")
+
+
+def save(path, benchmark, results, parameters=None):
+    """
+    Stores results with information about environment
+    :param path:
+    :param benchmark: benchmark name
+    :param results: nested dictionary of metrics
+    :param parameters: workload parameters, results measured with other
+        parameters are not compared
+    :return:
+    """
+    import pygame
+    data = {
+        'benchmark': benchmark,
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'parameters': parameters or {},
+        'results': results,
+    }
+    with open(path, 'w') as file_data:
+        json.dump(data, file_data, indent=2)
+
+
+def load(path):
+    """
+    Loads results stored by save
+    :param path:
+    :return:
+    """
+    with open(path) as file_data:
+        return json.load(file_data)['results']
+
+
+def load_parameters(path):
+    """
+    Loads workload parameters stored by save
+    :param path:
+    :return:
+    """
+    with open(path) as file_data:
+        return json.load(file_data).get('parameters', {})
+
+
+def flatten(results, prefix=''):
+    """
+    Flattens nested metrics to dictionary with dotted names
+    :param results:
+    :param prefix:
+    :return:
+    """
+    metrics = {}
+    for name, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, prefix + name + '.'))
+        elif isinstance(value, (int, float)):
+            metrics[prefix + name] = value
+    return metrics
+
+
+def compare(baseline, current, higher_is_better=(), tolerance=0.1):
+    """
+    Compares metrics present in both results. Metrics are lower-is-better,
+    unless last part of their name is in higher_is_better
+    :param baseline:
+    :param current:
+    :param higher_is_better: metric names
+    :param tolerance: relative change treated as regression
+    :return: list of (metric, baseline value, current value, relative change,
+        is regression)
+    """
+    baseline = flatten(baseline)
+    current = flatten(current)
+    comparison = []
+    for metric in sorted(set(baseline) & set(current)):
+        old, new = baseline[metric], current[metric]
+        if old == 0:
+            continue
+        change = (new - old) / abs(old)
+        worse = -change if metric.rsplit('.', 1)[-1] in higher_is_better \
+            else change
+        comparison.append((metric, old, new, change, worse > tolerance))
+    return comparison
+
+
+def print_comparison(comparison):
+    """
+    Prints comparison table
+    :param comparison:
+    :return: number of regressions
+    """
+    regressions = 0
+    for metric, old, new, change, is_regression in comparison:
+        regressions += is_regression
+        print("{0:<48}{1:>14.4g}{2:>14.4g}{3:>+9.1%}{4}".format(
+            metric, old, new, change, '  REGRESSION' if is_regression else ''))
+    return regressions
+
+
+def finish(arguments, benchmark, results, higher_is_better=(),
+           parameters=None):
+    """
+    Saves results and compares them with baseline according to arguments
+    :param arguments: parsed arguments (see add_arguments)
+    :param benchmark:
+    :param results:
+    :param higher_is_better:
+    :param parameters: workload parameters, stored with results
+    :return: process exit code, 1 if any regression was found, 2 if
+        baseline was measured with different parameters
+    """
+    if arguments.output is not None:
+        save(arguments.output, benchmark, results, parameters)
+    if arguments.compare is None:
+        return 0
+    baseline_parameters = load_parameters(arguments.compare)
+    if baseline_parameters != (parameters or {}):
+        print("Baseline parameters {0} differ from current {1}, results "
+              "are not comparable".format(baseline_parameters,
+                                          parameters or {}))
+        return 2
+    comparison = compare(load(arguments.compare), results, higher_is_better,
+                         arguments.tolerance)
+    regressions = print_comparison(comparison)
+    print("{0} regression(s)".format(regressions))
+    return 1 if regressions else 0
@@ -0,0 +1,277 @@
+"""
+Measures simulation throughput of gameplay stack (level, waves, logic,
+effects, controllers, AI) without rendering, on generated scenarios.
+
+Run from repository root:
+    python -m benchmark.SimulationBenchmark --output simulation.json
+    python -m benchmark.SimulationBenchmark --compare simulation.json
+    python -m benchmark.SimulationBenchmark --monsters 1000 --towers 40
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmark import Results
+from benchmark.Headless import init_pygame, HeadlessApp
+from pytowerdefence.Profiler import AllocationTracker
+
+MAP_FILE = 'data/maps/test.tmx'
+SCREEN_SIZE = (1024, 768)
+BASE_HP = 10 ** 9
+TOWER_OFFSET = 60
+CREATION_INTERVAL = 0.2
+DT = 1. / 60.
+
+
+class Scenario:
+    """
+    Generated scenario: monsters spread over map paths and towers placed
+    along them, optionally evolved
+    """
+
+    def __init__(self, name, monsters, towers, evolutions=0,
+                 monster='Ogre', tower='Bandit'):
+        self.name = name
+        self.monsters = monsters
+        self.towers = towers
+        self.evolutions = evolutions
+        self.monster = monster
+        self.tower = tower
+
+
+MONSTERS = 200
+TOWERS = 12
+SCENARIO_NAMES = ('monsters', 'towers', 'slow_towers')
+
+
+def create_scenarios(monsters=MONSTERS, towers=TOWERS):
+    """
+    Creates scenarios with N monsters and M towers
+    :param monsters:
+    :param towers:
+    :return:
+    """
+    return [
+        Scenario('monsters', monsters=monsters, towers=0),
+        Scenario('towers', monsters=monsters, towers=towers),
+        Scenario('slow_towers', monsters=monsters, towers=towers,
+                 evolutions=2),
+    ]
+
+
+def place_towers(level, factory, count, name='Bandit', evolutions=0):
+    """
+    Places towers evenly along level paths, alternately on both sides
+    :param level:
+    :param factory:
+    :param count:
+    :param name:
+    :param evolutions: number of evolutions of each tower
+    :return: list of towers
+    """
+    from pygame.math import Vector2
+    from pytowerdefence.gameplay.Objects import PLAYER_TEAM
+
+    paths = level.paths
+    per_path = -(-count // len(paths))
+    towers = []
+    for index in range(count):
+        path = paths[index % len(paths)]
+        distance = path.length * (index // len(paths) + 1) / (per_path + 1)
+        segment = path.segment_at(distance)
+        direction = path.directions[segment]
+        side = 1 if index % 2 else -1
+        tower = factory.create(name)
+        tower.position = path.position_at(distance, segment) + Vector2(
+            -direction.y, direction.x) * TOWER_OFFSET * side
+        level.add(tower)
+        level.add_obstacle(tower)
+        tower.team = PLAYER_TEAM
+        for _ in range(evolutions):
+            tower.evolve()
+        towers.append(tower)
+    return towers
+
+
+class Simulation:
+    """
+    Gameplay systems of GamePhase without display dependent parts
+    """
+
+    def __init__(self, scenario):
+        from pytowerdefence.Scheduler import SystemScheduler
+        from pytowerdefence.gameplay.GamePhase import GamePhase
+        from pytowerdefence.gameplay.Logic import LogicManager, WaveManager
+        from pytowerdefence.gameplay.LogicalEffects import LogicEffectManager
+        from pytowerdefence.gameplay.Scene import Level, CreaturesFactory
+
+        self.logic_manager = LogicManager({'player_gold': 0}, HeadlessApp())
+        self.level = Level(SCREEN_SIZE, self.logic_manager)
+        self.level.load(MAP_FILE)
+        self.level.base.hp = BASE_HP
+        self.factory = CreaturesFactory(self.level)
+
+        self.wave_manager = WaveManager(self.factory)
+        self.wave_manager.load_data(self._create_waves(scenario))
+        self.logic_manager.wave_manager = self.wave_manager
+        place_towers(self.level, self.factory, scenario.towers,
+                     scenario.tower, scenario.evolutions)
+
+        effect_manager = LogicEffectManager(self.level)
+        self.scheduler = SystemScheduler()
+        self.scheduler.add('waves', self.wave_manager.update)
+        self.scheduler.add('movement', self.level.update_objects)
+        self.scheduler.add('visibility', self.level.update_visibility,
+                           GamePhase.VISIBILITY_RATE)
+        self.scheduler.add('logic', self.logic_manager.update)
+        self.scheduler.add('effects', effect_manager.update,
+                           GamePhase.EFFECTS_RATE)
+
+    def _create_waves(self, scenario):
+        paths = len(self.level.paths)
+        return {'waves': [{
+            'type': 'standard',
+            'start_time': 0,
+            'creation_interval': CREATION_INTERVAL,
+            'number_of_objects': len(range(index, scenario.monsters, paths)),
+            'objects': [{'name': scenario.monster, 'path': index}],
+        } for index in range(paths)]}
+
+    def run(self, ticks):
+        """
+        Runs simulation with fixed time step
+        :param ticks:
+        :return:
+        """
+        for _ in range(ticks):
+            self.scheduler.update(DT)
+
+    def run_tracked(self, ticks, tracker):
+        """
+        Runs simulation and attributes allocations of every tick
+        :param ticks:
+        :param tracker: AllocationTracker
+        :return:
+        """
+        tracker.start()
+        for _ in range(ticks):
+            tracker.begin_tick()
+            self.scheduler.update(DT)
+            tracker.end_tick()
+        tracker.stop()
+
+
+def track_allocations(scenario, warmup, ticks):
+    """
+    Runs scenario until steady state and attributes allocations of
+    following ticks
+    :param scenario:
+    :param warmup: ticks before tracking
+    :param ticks: tracked ticks
+    :return: AllocationTracker
+    """
+    simulation = Simulation(scenario)
+    simulation.run(warmup)
+    tracker = AllocationTracker()
+    simulation.run_tracked(ticks, tracker)
+    return tracker
+
+
+def print_allocations(tracker):
+    """
+    Prints allocation sites and modules
+    :param tracker:
+    :return:
+    """
+    print("{0:<40}{1:<52}{2:>12}{3:>12}".format(
+        'module:line', 'function', 'blocks/tick', 'bytes/tick'))
+    for module, function, line, blocks, size in tracker.report():
+        print("{0:<40}{1:<52}{2:>12.2f}{3:>12.1f}".format(
+            '{0}:{1}'.format(module, line), function, blocks, size))
+    for module, (blocks, size) in sorted(tracker.modules().items(),
+                                         key=lambda item: -item[1][0]):
+        print("{0:<92}{1:>12.2f}{2:>12.1f}".format(module, blocks, size))
+
+
+def run_scenario(scenario, ticks, measure_memory=True):
+    """
+    Runs scenario and returns its metrics. Peak memory is measured in
+    separate run, as tracemalloc slows down simulation
+    :param scenario:
+    :param ticks:
+    :param measure_memory:
+    :return:
+    """
+    simulation = Simulation(scenario)
+    start = time.perf_counter()
+    simulation.run(ticks)
+    duration = time.perf_counter() - start
+
+    result = {
+        'ticks_per_second': ticks / duration,
+        'systems_ms': {system.name: system.total_duration * 1000. / ticks
+                       for system in simulation.scheduler.systems},
+    }
+    if measure_memory:
+        tracemalloc.start()
+        Simulation(scenario).run(ticks)
+        result['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] / 1024.
+        tracemalloc.stop()
+    return result
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Headless simulation throughput benchmark")
+    parser.add_argument('--ticks', type=int, default=3600,
+                        help="simulated ticks per scenario (60 per second)")
+    parser.add_argument('--scenario', action='append',
+                        choices=SCENARIO_NAMES,
+                        help="run only selected scenarios")
+    parser.add_argument('--monsters', type=int, default=MONSTERS,
+                        help="monsters in every scenario")
+    parser.add_argument('--towers', type=int, default=TOWERS,
+                        help="towers in scenarios with towers")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip peak memory measurement")
+    parser.add_argument('--allocations', type=int, metavar='TICKS',
+                        help="attribute allocations of TICKS steady state "
+                             "ticks (after --ticks warmup) to functions")
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    init_pygame(SCREEN_SIZE)
+
+    results = {}
+    for scenario in create_scenarios(arguments.monsters, arguments.towers):
+        if arguments.scenario and scenario.name not in arguments.scenario:
+            continue
+        result = run_scenario(scenario, arguments.ticks,
+                              not arguments.no_memory)
+        results[scenario.name] = result
+        print("{0:<14}{1:>10.1f} ticks/s  {2}".format(
+            scenario.name, result['ticks_per_second'],
+            '  '.join('{0} {1:.3f} ms'.format(name, value)
+                      for name, value in result['systems_ms'].items())))
+        if 'peak_memory_kb' in result:
+            print("{0:<14}{1:>10.1f} kB peak".format(
+                '', result['peak_memory_kb']))
+        if arguments.allocations:
+            tracker = track_allocations(scenario, arguments.ticks,
+                                        arguments.allocations)
+            result['allocated_blocks_per_tick'] = \
+                sum(blocks for blocks, _ in tracker.modules().values())
+            print_allocations(tracker)
+
+    return Results.finish(arguments, 'simulation', results,
+                          higher_is_better={'ticks_per_second'},
+                          parameters={'monsters': arguments.monsters,
+                                      'towers': arguments.towers})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
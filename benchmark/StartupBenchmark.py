@@ -0,0 +1,217 @@
+"""
+Measures startup: module imports, pygame initialisation, main menu and
+game phase initialisation, and time to first frame. Every run is done in
+fresh interpreter, so imports are cold; median of runs is reported.
+
+Run from repository root:
+    python -m benchmark.StartupBenchmark --output startup.json
+    python -m benchmark.StartupBenchmark --compare startup.json
+"""
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from benchmark import Results
+from benchmark.Headless import set_dummy_drivers
+
+SCREEN_SIZE = (1024, 768)
+LEVEL_FILE = 'data/maps/1.json'
+MODULES = [
+    'pygame',
+    'pyscroll',
+    'pytmx',
+    'pyganim',
+    'pytowerdefence.UI',
+    'pytowerdefence.gameplay.Objects',
+    'pytowerdefence.gameplay.Scene',
+    'pytowerdefence.gameplay.Logic',
+    'pytowerdefence.gameplay.Widgets',
+    'pytowerdefence.gameplay.GamePhase',
+    'pytowerdefence.mainmenu.MainMenuPhase',
+    'pytowerdefence.App',
+]
+
+
+@contextmanager
+def timed_calls(timings, name, owner, attribute):
+    """
+    Temporarily wraps method (or class method) of owner class and adds
+    duration of its calls to timings[name]
+    :param timings:
+    :param name:
+    :param owner:
+    :param attribute:
+    :return:
+    """
+    original = owner.__dict__[attribute]
+    function = getattr(owner, attribute)
+    is_class_method = isinstance(original, classmethod)
+    timings.setdefault(name, 0.)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            if is_class_method:
+                return function(*args, **kwargs)
+            return original(*args, **kwargs)
+        finally:
+            timings[name] += time.perf_counter() - start
+
+    setattr(owner, attribute,
+            staticmethod(wrapper) if is_class_method else wrapper)
+    try:
+        yield
+    finally:
+        setattr(owner, attribute, original)
+
+
+def measure_startup():
+    """
+    Runs startup steps in current interpreter. Must be called before any
+    of measured modules is imported
+    :return: dictionary of durations in milliseconds and wall clock time of
+        first frame
+    """
+    timings = {}
+    imports = {}
+    set_dummy_drivers()
+    for module in MODULES:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        imports[module] = time.perf_counter() - start
+
+    import pygame
+    from benchmark.Headless import HeadlessApp
+    from pytowerdefence.Resource import ResourceManager
+    from pytowerdefence.UI import UIManager
+    from pytowerdefence.gameplay.GamePhase import GamePhase
+    from pytowerdefence.gameplay.Logic import WaveManager
+    from pytowerdefence.gameplay.Scene import Level
+    from pytowerdefence.mainmenu.MainMenuPhase import MainMenuPhase
+
+    start = time.perf_counter()
+    pygame.init()
+    timings['pygame_init'] = time.perf_counter() - start
+    start = time.perf_counter()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    timings['set_mode'] = time.perf_counter() - start
+
+    app = HeadlessApp()
+    ui_manager = UIManager(SCREEN_SIZE)
+    start = time.perf_counter()
+    main_menu = MainMenuPhase(app, ui_manager)
+    main_menu.initialise()
+    timings['main_menu_initialise'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    main_menu.update(0.)
+    ui_manager.update(0.)
+    main_menu.draw(screen)
+    ui_manager.draw(screen)
+    pygame.display.flip()
+    timings['first_frame'] = time.perf_counter() - start
+    first_frame_time = time.time()
+
+    game = {}
+    start = time.perf_counter()
+    main_menu.on_destroy()
+    phase = GamePhase(app, ui_manager)
+    with timed_calls(game, 'map_load', Level, 'load'), \
+            timed_calls(game, 'wave_load', WaveManager, 'load'), \
+            timed_calls(game, 'image_loads', ResourceManager, 'load_image'), \
+            timed_calls(game, 'animation_loads', ResourceManager,
+                        'load_animation'):
+        phase.initialise(filename=LEVEL_FILE)
+    game['total'] = time.perf_counter() - start
+    game['widgets_and_other'] = \
+        game['total'] - game['map_load'] - game['wave_load']
+
+    start = time.perf_counter()
+    phase.update(0.)
+    ui_manager.update(0.)
+    phase.draw(screen)
+    ui_manager.draw(screen)
+    pygame.display.flip()
+    game['first_frame'] = time.perf_counter() - start
+
+    return {
+        'imports_ms': to_ms(imports),
+        'startup_ms': to_ms(timings),
+        'game_phase_ms': to_ms(game),
+        'first_frame_wall_time': first_frame_time,
+    }
+
+
+def to_ms(durations):
+    """
+    Converts durations in seconds to milliseconds
+    :param durations:
+    :return:
+    """
+    return {name: value * 1000. for name, value in durations.items()}
+
+
+def run_child():
+    """
+    Runs measurement in fresh interpreter
+    :return: measured results with time to first frame in milliseconds
+    """
+    start = time.time()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmark.StartupBenchmark', '--child'],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result['time_to_first_frame_ms'] = \
+        (result.pop('first_frame_wall_time') - start) * 1000.
+    return result
+
+
+def median_results(runs):
+    """
+    Returns median of each metric
+    :param runs: list of nested results
+    :return:
+    """
+    first = runs[0]
+    if isinstance(first, dict):
+        return {name: median_results([run[name] for run in runs])
+                for name in first}
+    return statistics.median(runs)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Startup and load time benchmark")
+    parser.add_argument('--runs', type=int, default=5,
+                        help="number of measured interpreter starts")
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    Results.add_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    set_dummy_drivers()
+    if arguments.child:
+        print(json.dumps(measure_startup()))
+        return 0
+
+    results = median_results([run_child() for _ in range(arguments.runs)])
+    print("time to first frame {0:>10.1f} ms".format(
+        results['time_to_first_frame_ms']))
+    for group in ('imports_ms', 'startup_ms', 'game_phase_ms'):
+        print(group)
+        for name, value in results[group].items():
+            print("  {0:<48}{1:>10.1f} ms".format(name, value))
+
+    return Results.finish(arguments, 'startup', results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,15 @@
 """
 Start module
 """
+import argparse
+import time
+
 import pygame
 
-from pytowerdefence.UI import UIManager
+from pytowerdefence.GarbageCollection import GcMonitor, GcPolicy
+from pytowerdefence.Profiler import FrameProfiler, SamplingProfiler, \
+    HitchDetector
+from pytowerdefence.UI import UIManager, coalesce_mouse_motion
 from pytowerdefence.gameplay.GamePhase import GamePhase, GameEndPhase
 from pytowerdefence.mainmenu.MainMenuPhase import MainMenuPhase
 
@@ -12,12 +18,63 @@ class App:
     """
     Main starting class
     """
-    def __init__(self):
+    PROFILER_EXPORT_KEY = pygame.K_F10
+
+    def __init__(self, profiler=None, sampling_profiler=None,
+                 sampling_mode='hotkey', gc_policy=None, hitch_detector=None):
         self._running = True
         self._display_surf = None
         self.size = self.width, self.height = 1024, 768
         self._current_phase = None
+        self._phase_type = None
         self._ui_manager = None
+        self._profiler = profiler
+        self._sampling_profiler = sampling_profiler
+        self._sampling_mode = sampling_mode
+        if sampling_profiler is not None:
+            sampling_profiler.label_provider = self._sampling_label
+        self._gc_monitor = GcMonitor()
+        self._gc_policy = gc_policy
+        self._hitch_detector = hitch_detector
+
+    @property
+    def sampling_profiler(self):
+        """
+        Sampling profiler or None, when disabled
+        :return:
+        """
+        return self._sampling_profiler
+
+    @property
+    def sampling_mode(self):
+        """
+        Sampling capture mode: hotkey, app or game
+        :return:
+        """
+        return self._sampling_mode
+
+    @property
+    def gc_monitor(self):
+        """
+        Garbage collector pauses monitor
+        :return:
+        """
+        return self._gc_monitor
+
+    @property
+    def gc_policy(self):
+        """
+        Deferred collection policy or None, when default collector is used
+        :return:
+        """
+        return self._gc_policy
+
+    def _sampling_label(self):
+        phase = self._current_phase
+        phase_label = phase.profile_label() if phase is not None else None
+        if phase_label is None:
+            return str(self._phase_type)
+        return '{0}.{1}'.format(self._phase_type, phase_label)
 
     def on_init(self):
         """
@@ -29,8 +86,11 @@ class App:
             self.size, pygame.HWSURFACE | pygame.DOUBLEBUF)
 
         self._ui_manager = UIManager(self.size)
+        self._gc_monitor.install()
 
         self._running = True
+        if self._sampling_profiler is not None and self._sampling_mode == 'app':
+            self._sampling_profiler.start()
         self.set_phase('main_menu')
         return True
 
@@ -42,9 +102,25 @@ class App:
         """
         if event.type == pygame.QUIT:
             self._running = False
+        elif event.type == pygame.KEYDOWN \
+                and event.key == App.PROFILER_EXPORT_KEY \
+                and self._profiler is not None:
+            self._profiler.export()
         else:
             self._ui_manager.process_event(event)
 
+    def dispatch_events(self):
+        """
+        Processes pending events. Runs of mouse motion events are coalesced,
+        so hover handling runs once per run instead of once per event
+        :return: number of received and dispatched events
+        """
+        events = pygame.event.get()
+        dispatched = coalesce_mouse_motion(events)
+        for event in dispatched:
+            self.on_event(event)
+        return len(events), len(dispatched)
+
     def set_phase(self, phase_type, **kwargs):
         """
         Change current phase
@@ -55,6 +131,14 @@ class App:
         if self._current_phase is not None:
             self._current_phase.on_destroy()
 
+        if self._sampling_profiler is not None \
+                and self._sampling_mode == 'game':
+            if phase_type == 'game':
+                self._sampling_profiler.start()
+            else:
+                self._sampling_profiler.stop()
+
+        self._phase_type = phase_type
         if phase_type == 'game':
             self._current_phase = GamePhase(self, self._ui_manager)
         elif phase_type == 'main_menu':
@@ -87,6 +171,11 @@ class App:
         :return:
         """
         self._ui_manager.clear_all_widgets()
+        if self._profiler is not None:
+            self._profiler.export()
+        if self._sampling_profiler is not None:
+            self._sampling_profiler.stop()
+        self._gc_monitor.uninstall()
         pygame.quit()
 
     def on_execute(self):
@@ -98,19 +187,118 @@ class App:
         if not self.on_init():
             self._running = False
 
+        frame = self._frame if self._profiler is None \
+            else self._profiled_frame
         while self._running:
-            for event in pygame.event.get():
-                self.on_event(event)
+            frame(clock)
 
-            delta_time = clock.tick(60) / 1000.
+        self.on_cleanup()
 
-            self.on_loop(delta_time)
-            self.on_render()
-            pygame.display.flip()
+    def _frame(self, clock):
+        delta_time = clock.tick(60) / 1000.
+        start = time.perf_counter()
+        self.dispatch_events()
 
-        self.on_cleanup()
+        self.on_loop(delta_time)
+        self.on_render()
+        pygame.display.flip()
+
+        if self._gc_policy is not None:
+            self._gc_policy.on_frame_end(time.perf_counter() - start)
+
+    def _profiled_frame(self, clock):
+        profiler = self._profiler
+        profiler.begin_frame()
+
+        start = profiler.start()
+        delta_time = clock.tick(60) / 1000.
+        profiler.stop('wait', start)
+
+        start = input_start = profiler.start()
+        received, dispatched = self.dispatch_events()
+        profiler.stop('events', start)
+        profiler.set_count('events_received', received)
+        profiler.set_count('events_dispatched', dispatched)
+
+        start = frame_start = profiler.start()
+        self._current_phase.update(delta_time)
+        profiler.stop('phase_update', start)
+        start = profiler.start()
+        self._ui_manager.update(delta_time)
+        profiler.stop('ui_update', start)
+
+        start = profiler.start()
+        self._current_phase.draw(self._display_surf)
+        profiler.stop('phase_draw', start)
+        start = profiler.start()
+        self._ui_manager.draw(self._display_surf)
+        profiler.stop('ui_draw', start)
+
+        start = profiler.start()
+        pygame.display.flip()
+        profiler.stop('flip', start)
+        if received:
+            profiler.add_time('input_latency',
+                              profiler.start() - input_start)
+
+        if self._gc_policy is not None:
+            self._gc_policy.on_frame_end(
+                profiler.start() - frame_start)
+        self._gc_monitor.flush(profiler)
+        self._current_phase.collect_stats(profiler)
+        profiler.end_frame()
+
+        if self._hitch_detector is not None:
+            self._hitch_detector.check(profiler)
+
+
+def parse_arguments():
+    """
+    Parse command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description="Tower defence game")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="enable frame profiler and export it to PATH "
+                             "(.csv or .json) at exit or on F10")
+    parser.add_argument('--profile-frames', type=int, default=3600,
+                        help="number of last frames kept by profiler")
+    parser.add_argument('--sample-dir', metavar='DIR',
+                        help="enable sampling profiler, collapsed stacks are "
+                             "written to DIR")
+    parser.add_argument('--sample-mode', choices=['hotkey', 'app', 'game'],
+                        default='hotkey',
+                        help="capture whole app, only game phase, or only "
+                             "between F9 presses in game")
+    parser.add_argument('--gc-policy', choices=['default', 'deferred'],
+                        default='default',
+                        help="deferred: freeze level objects and run full "
+                             "collections only when game is idle")
+    parser.add_argument('--hitch-log', metavar='PATH',
+                        help="append frames exceeding budget, with frames "
+                             "preceding them, to PATH")
+    parser.add_argument('--hitch-budget', type=float, default=25.,
+                        metavar='MS', help="hitch frame time budget")
+    parser.add_argument('--hitch-history', type=int, default=10,
+                        help="number of previous frames stored with hitch")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    application = App()
+    arguments = parse_arguments()
+    frame_profiler = None
+    if arguments.profile is not None or arguments.hitch_log is not None:
+        frame_profiler = FrameProfiler(arguments.profile_frames,
+                                       arguments.profile)
+    detector = None
+    if arguments.hitch_log is not None:
+        detector = HitchDetector(arguments.hitch_log,
+                                 arguments.hitch_budget / 1000.,
+                                 arguments.hitch_history)
+    sampler = None
+    if arguments.sample_dir is not None:
+        sampler = SamplingProfiler(arguments.sample_dir)
+    policy = GcPolicy() if arguments.gc_policy == 'deferred' else None
+    application = App(frame_profiler, sampler, arguments.sample_mode, policy,
+                      detector)
     application.on_execute()
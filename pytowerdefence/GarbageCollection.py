@@ -0,0 +1,174 @@
+"""
+Garbage collector instrumentation and collection policy
+"""
+import gc
+import time
+from collections import deque
+
+GENERATIONS = 3
+
+
+class GcMonitor:
+    """
+    Measures garbage collector pauses per generation using gc.callbacks
+    """
+    RECENT_PAUSES = 100
+
+    def __init__(self):
+        self.collections = [0] * GENERATIONS
+        self.recent_pauses = deque(maxlen=self.RECENT_PAUSES)
+        self._frame_pauses = [0.] * GENERATIONS
+        self._start = 0.
+        self._installed = False
+
+    @property
+    def max_recent_pause(self):
+        """
+        Longest of recent pauses
+        :return:
+        """
+        return max(self.recent_pauses, default=0.)
+
+    def install(self):
+        """
+        Registers monitor in gc.callbacks
+        :return:
+        """
+        if not self._installed:
+            gc.callbacks.append(self._on_gc)
+            self._installed = True
+
+    def uninstall(self):
+        """
+        Removes monitor from gc.callbacks
+        :return:
+        """
+        if self._installed:
+            gc.callbacks.remove(self._on_gc)
+            self._installed = False
+
+    def flush(self, profiler):
+        """
+        Records pauses since last flush in current frame of profiler
+        :param profiler:
+        :return:
+        """
+        for generation in range(GENERATIONS):
+            profiler.add_time('gc.gen{0}'.format(generation),
+                              self._frame_pauses[generation])
+            self._frame_pauses[generation] = 0.
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self._start
+            generation = info['generation']
+            self.collections[generation] += 1
+            self._frame_pauses[generation] += pause
+            self.recent_pauses.append(pause)
+
+
+class GcPolicy:
+    """
+    Deferred collection policy. Objects existing after level load are frozen
+    and automatic full collections are disabled. Full collection runs when
+    game is idle: between waves or when frame leaves enough spare time.
+    If it is deferred too long, it is forced to bound memory growth
+    """
+    DEFERRED_THRESHOLD = 1000000
+    MAX_DEFERRAL = 10
+
+    def __init__(self, frame_budget=1. / 60.):
+        self.frame_budget = frame_budget
+        self.collections = 0
+        self.forced_collections = 0
+        self._last_duration = 0.
+        self._thresholds = None
+
+    @property
+    def enabled(self):
+        """
+        True, if automatic full collections are deferred
+        :return:
+        """
+        return self._thresholds is not None
+
+    @property
+    def collection_due(self):
+        """
+        True, if automatic full collection would have already run
+        :return:
+        """
+        return self.enabled and gc.get_count()[2] >= self._thresholds[2]
+
+    def enable(self):
+        """
+        Disables automatic full collections
+        :return:
+        """
+        if self.enabled:
+            return
+        self._thresholds = gc.get_threshold()
+        gen0, gen1, _ = self._thresholds
+        gc.set_threshold(gen0, gen1, self.DEFERRED_THRESHOLD)
+
+    def disable(self):
+        """
+        Restores automatic collections and unfreezes objects
+        :return:
+        """
+        if not self.enabled:
+            return
+        gc.set_threshold(*self._thresholds)
+        self._thresholds = None
+        gc.unfreeze()
+
+    def freeze(self):
+        """
+        Collects garbage and moves all remaining objects to permanent
+        generation, so they are not traversed by later collections
+        :return:
+        """
+        gc.collect()
+        gc.freeze()
+
+    def unfreeze(self):
+        """
+        Moves frozen objects back to oldest generation
+        :return:
+        """
+        gc.unfreeze()
+
+    def on_idle(self):
+        """
+        Called when game is idle (e.g. between waves)
+        :return:
+        """
+        if self.collection_due:
+            self.collect()
+
+    def on_frame_end(self, frame_time):
+        """
+        Runs due collection, if it fits in spare time of frame. Forces
+        collection, if it was deferred too long
+        :param frame_time: time spent on frame work
+        :return:
+        """
+        if not self.collection_due:
+            return
+        if self._last_duration < self.frame_budget - frame_time:
+            self.collect()
+        elif gc.get_count()[2] >= self._thresholds[2] * self.MAX_DEFERRAL:
+            self.forced_collections += 1
+            self.collect()
+
+    def collect(self):
+        """
+        Runs full collection
+        :return:
+        """
+        start = time.perf_counter()
+        gc.collect(2)
+        self._last_duration = time.perf_counter() - start
+        self.collections += 1
@@ -35,6 +35,23 @@ class Phase:
         """
         pass
 
+    def profile_label(self):
+        """
+        Returns label appended to phase name in sampling profiler output,
+        or None
+        :return:
+        """
+        return None
+
+    def collect_stats(self, profiler):
+        """
+        Called every profiled frame. Phase can add its own timings and
+        counters to the frame
+        :param profiler:
+        :return:
+        """
+        pass
+
     def on_destroy(self):
         """
         Called when phase is destroyed
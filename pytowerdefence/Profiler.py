@@ -0,0 +1,460 @@
+"""
+Profiler module
+"""
+import ast
+import csv
+import itertools
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+
+def percentile(sorted_values, percent):
+    """
+    Returns percentile of sorted values (nearest rank method)
+    :param sorted_values:
+    :param percent:
+    :return:
+    """
+    if not sorted_values:
+        return 0.
+    rank = int(math.ceil(percent / 100. * len(sorted_values))) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+class FrameProfiler:
+    """
+    Collects timings of frame stages and entity counts. Last frames are kept
+    in ring buffer, which can be summarised and exported to CSV/JSON
+    """
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, capacity=3600, export_path=None):
+        self.export_path = export_path
+        self._frames = deque(maxlen=capacity)
+        self._frame = None
+        self._frame_start = 0.
+        self._frame_index = 0
+
+    @property
+    def frames(self):
+        """
+        Recorded frames, oldest first
+        :return:
+        """
+        return self._frames
+
+    @property
+    def last_frame(self):
+        """
+        Last finished frame or None
+        :return:
+        """
+        return self._frames[-1] if self._frames else None
+
+    def begin_frame(self):
+        """
+        Starts recording of new frame
+        :return:
+        """
+        self._frame = {'frame': self._frame_index}
+        self._frame_index += 1
+        self._frame_start = time.perf_counter()
+
+    @staticmethod
+    def start():
+        """
+        Returns time stamp, which should be passed to stop
+        :return:
+        """
+        return time.perf_counter()
+
+    def stop(self, name, start):
+        """
+        Records duration of stage started at given time stamp
+        :param name:
+        :param start:
+        :return:
+        """
+        self._frame[name] = time.perf_counter() - start
+
+    def add_time(self, name, duration):
+        """
+        Records duration measured elsewhere
+        :param name:
+        :param duration:
+        :return:
+        """
+        self._frame[name] = duration
+
+    def set_count(self, name, value):
+        """
+        Records counter value (e.g. number of entities)
+        :param name:
+        :param value:
+        :return:
+        """
+        self._frame[name] = value
+
+    def end_frame(self):
+        """
+        Finishes frame and stores it in ring buffer
+        :return:
+        """
+        self._frame['total'] = time.perf_counter() - self._frame_start
+        self._frames.append(self._frame)
+        self._frame = None
+
+    def summary(self):
+        """
+        Returns percentile summary of every recorded value
+        :return:
+        """
+        values = {}
+        for frame in self._frames:
+            for name, value in frame.items():
+                if name != 'frame':
+                    values.setdefault(name, []).append(value)
+
+        summary = {}
+        for name, samples in values.items():
+            samples.sort()
+            stats = {'p{0}'.format(p): percentile(samples, p)
+                     for p in FrameProfiler.PERCENTILES}
+            stats['mean'] = sum(samples) / len(samples)
+            stats['max'] = samples[-1]
+            summary[name] = stats
+        return summary
+
+    def export(self, path=None):
+        """
+        Exports frames to file. Format is chosen by extension (.csv or .json)
+        :param path:
+        :return:
+        """
+        path = path or self.export_path
+        if path is None:
+            return
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def export_csv(self, path):
+        """
+        Exports one row per frame
+        :param path:
+        :return:
+        """
+        columns = []
+        for frame in self._frames:
+            for name in frame:
+                if name not in columns:
+                    columns.append(name)
+        with open(path, 'w', newline='') as file_data:
+            writer = csv.DictWriter(file_data, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self._frames)
+
+    def export_json(self, path):
+        """
+        Exports summary and frames
+        :param path:
+        :return:
+        """
+        with open(path, 'w') as file_data:
+            json.dump({'summary': self.summary(),
+                       'frames': list(self._frames)}, file_data, indent=1)
+
+
+class AllocationTracker:
+    """
+    Attributes memory blocks allocated during tick and still alive at its
+    end to source lines and functions, using tracemalloc snapshot per tick.
+    Temporaries freed within tick are not visible to tracemalloc
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.last_tick_blocks = 0
+        self._totals = {}
+        self._functions = {}
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                         tracemalloc.Filter(False, __file__)]
+
+    def start(self):
+        """
+        Starts tracing allocations
+        :return:
+        """
+        tracemalloc.start()
+
+    def stop(self):
+        """
+        Stops tracing allocations
+        :return:
+        """
+        tracemalloc.stop()
+
+    def begin_tick(self):
+        """
+        Forgets allocations made before tick
+        :return:
+        """
+        tracemalloc.clear_traces()
+
+    def end_tick(self):
+        """
+        Attributes allocations alive at the end of tick
+        :return:
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        blocks = 0
+        for statistic in snapshot.statistics('lineno'):
+            frame = statistic.traceback[0]
+            location = (frame.filename, frame.lineno)
+            total = self._totals.setdefault(location, [0, 0])
+            total[0] += statistic.count
+            total[1] += statistic.size
+            blocks += statistic.count
+        self.last_tick_blocks = blocks
+        self.ticks += 1
+
+    def report(self, limit=20):
+        """
+        Returns allocation sites sorted by number of blocks per tick
+        :param limit:
+        :return: list of (module, function, line, blocks per tick,
+            bytes per tick)
+        """
+        ticks = max(self.ticks, 1)
+        entries = sorted(self._totals.items(), key=lambda item: -item[1][0])
+        return [(self._module_name(filename),
+                 self._function_at(filename, lineno), lineno,
+                 count / ticks, size / ticks)
+                for (filename, lineno), (count, size) in entries[:limit]]
+
+    def modules(self):
+        """
+        Returns blocks and bytes per tick summed per module
+        :return:
+        """
+        ticks = max(self.ticks, 1)
+        modules = {}
+        for (filename, _), (count, size) in self._totals.items():
+            total = modules.setdefault(self._module_name(filename), [0., 0.])
+            total[0] += count / ticks
+            total[1] += size / ticks
+        return modules
+
+    @staticmethod
+    def _module_name(filename):
+        parts = os.path.normpath(filename).split(os.sep)
+        if 'pytowerdefence' in parts:
+            index = len(parts) - 1 - parts[::-1].index('pytowerdefence')
+            parts = parts[index:]
+        else:
+            parts = parts[-1:]
+        return os.path.splitext('.'.join(parts))[0]
+
+    def _function_at(self, filename, lineno):
+        if filename not in self._functions:
+            self._functions[filename] = self._function_ranges(filename)
+        for start, end, name in self._functions[filename]:
+            if start <= lineno <= end:
+                return name
+        return '<module>'
+
+    @staticmethod
+    def _function_ranges(filename):
+        try:
+            with open(filename) as file_data:
+                tree = ast.parse(file_data.read())
+        except (OSError, SyntaxError, ValueError):
+            return []
+        ranges = []
+
+        def visit(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef,
+                                      ast.ClassDef)):
+                    name = prefix + child.name
+                    if not isinstance(child, ast.ClassDef):
+                        ranges.append((child.lineno, child.end_lineno, name))
+                    visit(child, name + '.')
+
+        visit(tree, '')
+        # innermost function first
+        ranges.sort(key=lambda item: item[1] - item[0])
+        return ranges
+
+
+class HitchDetector:
+    """
+    Captures frames exceeding time budget together with frames preceding
+    them. Captures are appended to rolling log (one JSON object per line),
+    times are stored in milliseconds and zero values are omitted
+    """
+
+    def __init__(self, path, budget=0.025, history=10, max_entries=100):
+        self.path = path
+        self.budget = budget
+        self.history = history
+        self.entries = deque(maxlen=max_entries)
+        self._written = 0
+
+    def check(self, profiler):
+        """
+        Captures last frame of profiler, if it exceeded budget
+        :param profiler:
+        :return: True, if frame was a hitch
+        """
+        frame = profiler.last_frame
+        if frame is None or frame['total'] <= self.budget:
+            return False
+
+        frames = list(itertools.islice(reversed(profiler.frames),
+                                       self.history + 1))
+        entry = {
+            'time': round(time.time(), 3),
+            'frame': self._compact(frame),
+            'previous': [self._compact(previous)
+                         for previous in reversed(frames[1:])],
+        }
+        self.entries.append(entry)
+        self._append(entry)
+        return True
+
+    @staticmethod
+    def _compact(frame):
+        # zero is measured value, only missing and empty values are dropped
+        compact = {}
+        for name, value in frame.items():
+            if value is None or value == {} or value == []:
+                continue
+            if isinstance(value, float):
+                value = round(value * 1000., 2)
+            compact[name] = value
+        return compact
+
+    def _append(self, entry):
+        if self._written >= 2 * self.entries.maxlen:
+            with open(self.path, 'w') as file_data:
+                for logged in self.entries:
+                    file_data.write(json.dumps(logged) + '\n')
+            self._written = len(self.entries)
+        else:
+            with open(self.path, 'a') as file_data:
+                file_data.write(json.dumps(entry) + '\n')
+            self._written += 1
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler. Sampler thread periodically reads stack of
+    profiled thread and counts collapsed stacks per label (e.g. phase and
+    wave). Result is written in flamegraph compatible collapsed format
+    """
+
+    def __init__(self, output_dir, interval=0.005):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.label_provider = None
+        self._thread_id = threading.get_ident()
+        self._stacks = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._captures = 0
+
+    @property
+    def running(self):
+        """
+        True when capture is in progress
+        :return:
+        """
+        return self._thread is not None
+
+    def start(self):
+        """
+        Starts new capture of thread which created profiler
+        :return:
+        """
+        if self.running:
+            return
+        self._stacks = {}
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops capture and writes collapsed stacks
+        :return: directory with written files or None, if not running
+        """
+        if not self.running:
+            return None
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        return self.write()
+
+    def toggle(self):
+        """
+        Starts or stops capture
+        :return:
+        """
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """
+        Takes single sample of profiled thread stack
+        :return:
+        """
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        label = self.label_provider() if self.label_provider is not None \
+            else 'app'
+
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append('{0} ({1}:{2})'.format(
+                code.co_name, os.path.basename(code.co_filename),
+                code.co_firstlineno))
+            frame = frame.f_back
+        stack = ';'.join(reversed(names))
+
+        counts = self._stacks.setdefault(label, {})
+        counts[stack] = counts.get(stack, 0) + 1
+
+    def write(self):
+        """
+        Writes one collapsed stacks file per label into new capture directory
+        :return: capture directory
+        """
+        self._captures += 1
+        directory = os.path.join(
+            self.output_dir, '{0}-{1}'.format(time.strftime('%Y%m%d-%H%M%S'),
+                                              self._captures))
+        os.makedirs(directory, exist_ok=True)
+        for label, counts in self._stacks.items():
+            file_name = re.sub(r'[^\w.-]', '_', label) + '.folded'
+            with open(os.path.join(directory, file_name), 'w') as file_data:
+                for stack, count in sorted(counts.items()):
+                    file_data.write('{0} {1}\n'.format(stack, count))
+        return directory
@@ -22,6 +22,8 @@ class ResourceManager:
     """
     Manages any resource
     """
+    loads = 0
+    _fonts = {}
 
     @classmethod
     def load_image(cls, resource_class, name):
@@ -32,6 +34,7 @@ class ResourceManager:
         :return:
         """
         resource_path = cls.get_path(resource_class, name)
+        cls.loads += 1
         return pygame.image.load(resource_path)
 
     @classmethod
@@ -44,6 +47,24 @@ class ResourceManager:
         """
         return os.path.join(resource_class, name)
 
+    @classmethod
+    def load_font(cls, resource_class, name, size):
+        """
+        Load font. Fonts are cached by path and size, so parsing font file
+        happens once
+        :param resource_class:
+        :param name:
+        :param size:
+        :return:
+        """
+        resource_path = cls.get_path(resource_class, name)
+        font = cls._fonts.get((resource_path, size))
+        if font is None:
+            cls.loads += 1
+            font = pygame.font.Font(resource_path, size)
+            cls._fonts[(resource_path, size)] = font
+        return font
+
     @classmethod
     def load_animation(cls, resource_class, name):
         """
@@ -52,6 +73,7 @@ class ResourceManager:
         :param name:
         :return:
         """
+        cls.loads += 1
         with open(cls.get_path(resource_class, name)) as file_data:
             data = json.load(file_data)
             image_path = cls.get_path(resource_class, data["image"])
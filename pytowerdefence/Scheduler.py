@@ -0,0 +1,144 @@
+"""
+Scheduler module
+"""
+import time
+
+
+class System:
+    """
+    Single system updated by scheduler. System with rate set is updated
+    at most rate times per second, with time accumulated since its last run
+    """
+
+    def __init__(self, name, update, rate=None):
+        self.name = name
+        self.rate = rate
+        self.enabled = True
+        self.runs = 0
+        self.last_duration = 0.
+        self.total_duration = 0.
+        self.max_duration = 0.
+        self._update = update
+        self._accumulated_dt = 0.
+
+    def tick(self, dt):
+        """
+        Advance system time and run update when interval elapsed
+        :param dt:
+        :return: True if system was updated
+        """
+        self.last_duration = 0.
+        if not self.enabled:
+            return False
+
+        self._accumulated_dt += dt
+        if self.rate is not None and self._accumulated_dt * self.rate < 1.:
+            return False
+
+        elapsed = self._accumulated_dt
+        self._accumulated_dt = 0.
+        start = time.perf_counter()
+        self._update(elapsed)
+        self.last_duration = time.perf_counter() - start
+        self.total_duration += self.last_duration
+        self.max_duration = max(self.max_duration, self.last_duration)
+        self.runs += 1
+        return True
+
+    @property
+    def average_duration(self):
+        """
+        Average time of single update in seconds
+        :return:
+        """
+        return self.total_duration / self.runs if self.runs else 0.
+
+    def reset_stats(self):
+        """
+        Reset timing statistics
+        :return:
+        """
+        self.runs = 0
+        self.last_duration = 0.
+        self.total_duration = 0.
+        self.max_duration = 0.
+
+
+class SystemScheduler:
+    """
+    Updates ordered list of systems, every one with its own tick rate
+    """
+
+    def __init__(self):
+        self._systems = []
+
+    @property
+    def systems(self):
+        """
+        Systems in update order
+        :return:
+        """
+        return self._systems
+
+    def add(self, name, update, rate=None):
+        """
+        Append system
+        :param name:
+        :param update: callable taking elapsed time
+        :param rate: updates per second, None means every tick
+        :return: created system
+        """
+        system = System(name, update, rate)
+        self._systems.append(system)
+        return system
+
+    def get(self, name):
+        """
+        Returns system by name
+        :param name:
+        :return:
+        """
+        for system in self._systems:
+            if system.name == name:
+                return system
+        return None
+
+    def set_enabled(self, name, enabled):
+        """
+        Enable or disable system. Disabled system does not accumulate time
+        :param name:
+        :param enabled:
+        :return:
+        """
+        self.get(name).enabled = enabled
+
+    def set_rate(self, name, rate):
+        """
+        Change tick rate of system
+        :param name:
+        :param rate:
+        :return:
+        """
+        self.get(name).rate = rate
+
+    def update(self, dt):
+        """
+        Update all systems in order
+        :param dt:
+        :return:
+        """
+        for system in self._systems:
+            system.tick(dt)
+
+    def stats(self):
+        """
+        Returns timing statistics of every system
+        :return:
+        """
+        return {system.name: {'enabled': system.enabled,
+                              'rate': system.rate,
+                              'runs': system.runs,
+                              'last': system.last_duration,
+                              'average': system.average_duration,
+                              'max': system.max_duration}
+                for system in self._systems}
@@ -1,6 +1,8 @@
 """
 UI Module
 """
+import bisect
+from collections import OrderedDict
 from enum import Enum, IntEnum
 
 import pygame
@@ -20,10 +22,15 @@ class PositionAttachType(Enum):
 
 class Widget(pygame.sprite.Sprite):
     """
-    Base class for any UI widget
+    Base class for any UI widget. Retained widgets are drawn into cached
+    surface of their layer, so they must call mark_dirty when they would
+    draw something different. Widgets which draw every frame set retained
+    to False
     """
+    retained = True
 
     def __init__(self, widget_id=None):
+        self._ui_manager = None
         self.z = 1
         self._rect = pygame.Rect(0, 0, 0, 0)
         self._position = Vector2()
@@ -34,6 +41,14 @@ class Widget(pygame.sprite.Sprite):
         self.widget_id = widget_id
         self._position_attach_type = PositionAttachType.TOP_LEFT
 
+    def mark_dirty(self):
+        """
+        Requests redraw of widget layer
+        :return:
+        """
+        if self._ui_manager is not None:
+            self._ui_manager.mark_layer_dirty(self.z)
+
     def remove_child(self, child):
         """
         Remove child
@@ -121,6 +136,9 @@ class Widget(pygame.sprite.Sprite):
 
         self._rect.x = self._position.x
         self._rect.y = self._position.y
+        if self._ui_manager is not None:
+            self._ui_manager.widget_moved(self)
+        self.mark_dirty()
         for child in self.children:
             child.position_changed()
 
@@ -146,7 +164,9 @@ class Widget(pygame.sprite.Sprite):
         :param value:
         :return:
         """
-        self._visible = value
+        if value != self._visible:
+            self._visible = value
+            self.mark_dirty()
         for child in self.children:
             child.visible = value
 
@@ -193,6 +213,51 @@ class Widget(pygame.sprite.Sprite):
         pass
 
 
+class TextCache:
+    """
+    LRU cache of rendered text surfaces, shared by all Text widgets.
+    Surfaces are only blitted, so widgets with same text share one surface
+    """
+    FONT = "monotype-corsiva.ttf"
+    MAX_SIZE = 256
+    _surfaces = OrderedDict()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def render(cls, text, size, color):
+        """
+        Returns rendered text
+        :param text:
+        :param size:
+        :param color:
+        :return:
+        """
+        key = (text, size, color)
+        surface = cls._surfaces.get(key)
+        if surface is not None:
+            cls.hits += 1
+            cls._surfaces.move_to_end(key)
+            return surface
+
+        cls.misses += 1
+        font = ResourceManager.load_font(ResourceClass.UI, cls.FONT, size)
+        surface = font.render(text, True, color)
+        cls._surfaces[key] = surface
+        if len(cls._surfaces) > cls.MAX_SIZE:
+            cls._surfaces.popitem(last=False)
+        return surface
+
+    @classmethod
+    def hit_rate(cls):
+        """
+        Returns fraction of renders served from cache
+        :return:
+        """
+        requests = cls.hits + cls.misses
+        return cls.hits / requests if requests else 0.
+
+
 class Text(Widget):
     """
     Widget which shows text
@@ -202,7 +267,6 @@ class Text(Widget):
         self._color = color
         self._size = size
         self._text = None
-        self._font = None
         self._surface = None
         self.text = text
 
@@ -217,17 +281,13 @@ class Text(Widget):
     @text.setter
     def text(self, text):
         """
-        Text value setter
+        Text value setter. Setting current text again does nothing
         :param text:
         :return:
         """
-        if text is not None:
+        if text is not None and text != self._text:
             self._text = text
-            self._font = pygame.font.Font(
-                ResourceManager.get_path(ResourceClass.UI,
-                                         "monotype-corsiva.ttf"),
-                self._size)
-            self._surface = self._font.render(text, True, self._color)
+            self._surface = TextCache.render(text, self._size, self._color)
             self._rect.width = self._surface.get_width()
             self._rect.height = self._surface.get_height()
             self.position_changed()
@@ -254,10 +314,12 @@ class Panel(Text):
         :return:
         """
         self._img = img
-        if self._img is not None:
-            rect = self._img.get_rect()
-            self._rect.width = rect.width
-            self._rect.height = rect.height
+        if self._img is not None \
+                and self._img.get_size() != self._rect.size:
+            self._rect.size = self._img.get_size()
+            self.position_changed()
+        else:
+            self.mark_dirty()
 
     def draw(self, surface):
         if self._img is not None:
@@ -354,6 +416,28 @@ def is_mouse_motion_event(event):
     return event.type == pygame.MOUSEMOTION
 
 
+def coalesce_mouse_motion(events):
+    """
+    Replaces every run of consecutive mouse motion events with its last
+    event, with relative motion of the whole run. Motions separated by other
+    events are kept apart, so clicks see pointer position they happened at
+    :param events:
+    :return: list of events
+    """
+    coalesced = []
+    for event in events:
+        if is_mouse_motion_event(event) and coalesced \
+                and is_mouse_motion_event(coalesced[-1]):
+            previous = coalesced[-1]
+            attributes = dict(event.dict)
+            attributes['rel'] = (previous.rel[0] + event.rel[0],
+                                 previous.rel[1] + event.rel[1])
+            coalesced[-1] = pygame.event.Event(pygame.MOUSEMOTION, attributes)
+        else:
+            coalesced.append(event)
+    return coalesced
+
+
 def visible_widgets_iterator(layer):
     """
     Iterate through visible widgets
@@ -365,6 +449,280 @@ def visible_widgets_iterator(layer):
             yield widget
 
 
+def root_widget(widget):
+    """
+    Returns topmost parent of widget
+    :param widget:
+    :return:
+    """
+    while widget.parent is not None:
+        widget = widget.parent
+    return widget
+
+
+def premultiplied(source):
+    """
+    Returns copy of surface with colors multiplied by alpha. Surfaces
+    without per pixel alpha are converted first, keeping colorkey and
+    surface alpha
+    :param source:
+    :return:
+    """
+    if not source.get_flags() & pygame.SRCALPHA \
+            or source.get_alpha() not in (None, 255):
+        converted = pygame.Surface(source.get_size(), pygame.SRCALPHA)
+        converted.blit(source, (0, 0))
+        source = converted
+    return source.premul_alpha()
+
+
+def disjoint_areas(rects):
+    """
+    Merges overlapping rects, so no pixel is covered twice
+    :param rects:
+    :return:
+    """
+    areas = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(areas)
+        while index >= 0:
+            rect.union_ip(areas.pop(index))
+            index = rect.collidelist(areas)
+        areas.append(rect)
+    return areas
+
+
+class PremultipliedCanvas:
+    """
+    Surface wrapper given to retained widgets. Blits are composed with
+    premultiplied alpha, so translucent widgets drawn on each other and
+    then on screen give the same pixels as drawing them on screen directly
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Blits premultiplied copy of source
+        :param source:
+        :param dest:
+        :param area:
+        :param special_flags: ignored
+        :return:
+        """
+        return self.surface.blit(premultiplied(source), dest, area,
+                                 pygame.BLEND_PREMULTIPLIED)
+
+
+class RetainedRun:
+    """
+    Consecutive retained widgets of layer, composed into cached surface.
+    Every frame only areas covered by widget trees are copied to screen,
+    in one blits call
+    """
+
+    def __init__(self, size):
+        self.widgets = []
+        self._size = size
+        self._canvas = None
+        self._areas = []
+
+    def redraw(self):
+        """
+        Composes visible widgets into cached surface
+        :return:
+        """
+        visible = list(visible_widgets_iterator(self.widgets))
+        if self._canvas is not None:
+            for area in self._areas:
+                self._canvas.surface.fill((0, 0, 0, 0), area)
+        areas = {}
+        for widget in visible:
+            root = root_widget(widget)
+            if root in areas:
+                areas[root].union_ip(widget.rect)
+            else:
+                areas[root] = widget.rect.copy()
+        self._areas = disjoint_areas(areas.values())
+        if not self._areas:
+            return
+
+        if self._canvas is None:
+            self._canvas = PremultipliedCanvas(
+                pygame.Surface(self._size, pygame.SRCALPHA))
+            self._canvas.surface.fill((0, 0, 0, 0))
+        for widget in visible:
+            widget.draw(self._canvas)
+
+    def draw(self, surface):
+        """
+        Copies composed areas to surface
+        :param surface:
+        :return:
+        """
+        if self._areas:
+            surface.blits([(self._canvas.surface, area, area,
+                            pygame.BLEND_PREMULTIPLIED)
+                           for area in self._areas], False)
+
+
+class UILayer:
+    """
+    Widgets with the same Z, drawn in order of adding. Runs of retained
+    widgets are composed into cached surfaces, which are redrawn only when
+    layer is dirty. Widgets which are not retained are drawn directly
+    between them
+    """
+
+    def __init__(self, size):
+        self.widgets = []
+        self.dirty = True
+        self._size = size
+        self._parts = []
+        self._runs = []
+
+    def __iter__(self):
+        return iter(self.widgets)
+
+    def append(self, widget):
+        """
+        Adds widget
+        :param widget:
+        :return:
+        """
+        self.widgets.append(widget)
+        self._parts = None
+        self.dirty = True
+
+    def remove(self, widget):
+        """
+        Removes widget
+        :param widget:
+        :return:
+        """
+        self.widgets.remove(widget)
+        self._parts = None
+        self.dirty = True
+
+    def draw(self, surface):
+        """
+        Draws cached runs of retained widgets and other visible widgets in
+        their order
+        :param surface:
+        :return:
+        """
+        if self._parts is None:
+            self._split()
+        if self.dirty:
+            self.dirty = False
+            for run in self._runs:
+                run.redraw()
+        for part in self._parts:
+            if isinstance(part, RetainedRun) or part.visible:
+                part.draw(surface)
+
+    def _split(self):
+        # cached surfaces of runs are reused, as widgets are rarely added
+        runs = self._runs
+        self._parts = []
+        self._runs = []
+        for widget in self.widgets:
+            if not widget.retained:
+                self._parts.append(widget)
+                continue
+            if not self._parts or not isinstance(self._parts[-1],
+                                                 RetainedRun):
+                run = runs.pop(0) if runs else RetainedRun(self._size)
+                run.widgets = []
+                self._parts.append(run)
+                self._runs.append(run)
+            self._parts[-1].widgets.append(widget)
+
+
+class HitTestGrid:
+    """
+    Uniform grid of widget rects. Every cell holds widgets covering it,
+    ordered from the top one, so point query checks only few widgets.
+    Moved widget is re-indexed only in its own cells
+    """
+    CELL_SIZE = 64
+
+    def __init__(self):
+        self._cells = {}
+        self._widget_cells = {}
+        self._keys = {}
+        self._added = 0
+
+    def add(self, widget):
+        """
+        Adds widget above widgets with lower Z. Of widgets with the same Z
+        the earlier added one is found first, as before grid was used
+        :param widget:
+        :return:
+        """
+        self.remove(widget)
+        self._added += 1
+        self._keys[widget] = (-widget.z, self._added)
+        self.move(widget)
+
+    def remove(self, widget):
+        """
+        Removes widget
+        :param widget:
+        :return:
+        """
+        key = self._keys.pop(widget, None)
+        for cell in self._widget_cells.pop(widget, ()):
+            entries = self._cells[cell]
+            entries.remove((key, widget))
+            if not entries:
+                del self._cells[cell]
+
+    def move(self, widget):
+        """
+        Re-indexes widget after its rect changed
+        :param widget:
+        :return:
+        """
+        key = self._keys.get(widget)
+        if key is None:
+            return
+        cells = self._cells_of(widget.rect)
+        previous = self._widget_cells.get(widget, [])
+        if cells == previous:
+            return
+        for cell in previous:
+            entries = self._cells[cell]
+            entries.remove((key, widget))
+            if not entries:
+                del self._cells[cell]
+        for cell in cells:
+            bisect.insort(self._cells.setdefault(cell, []), (key, widget))
+        self._widget_cells[widget] = cells
+
+    def _cells_of(self, rect):
+        if rect.width <= 0 or rect.height <= 0:
+            return []
+        size = self.CELL_SIZE
+        return [(x, y)
+                for x in range(rect.left // size, (rect.right - 1) // size + 1)
+                for y in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def widget_at(self, pos):
+        """
+        Returns top visible widget colliding with point
+        :param pos:
+        :return:
+        """
+        cell = (int(pos[0]) // self.CELL_SIZE, int(pos[1]) // self.CELL_SIZE)
+        for _, widget in self._cells.get(cell, ()):
+            if widget.visible and widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+
 class UIManager(object):
     """
     Manager of any widget
@@ -372,9 +730,31 @@ class UIManager(object):
 
     def __init__(self, window_size):
         self._widgets = {}
+        self._z_order = []
+        self._by_id = {}
+        self._updated_widgets = []
+        self._hit_test_grid = HitTestGrid()
         self._focused_widget = None
         self.window_size = Vector2(window_size[0], window_size[1])
 
+    def mark_layer_dirty(self, z):
+        """
+        Requests redraw of layer
+        :param z:
+        :return:
+        """
+        layer = self._widgets.get(z)
+        if layer is not None:
+            layer.dirty = True
+
+    def widget_moved(self, widget):
+        """
+        Updates hit test grid after widget rect changed
+        :param widget:
+        :return:
+        """
+        self._hit_test_grid.move(widget)
+
     def focus_widget(self, widget):
         """
         Focus widget. Focused widget will receive keyboard events
@@ -388,28 +768,33 @@ class UIManager(object):
         Removes all widgets
         :return:
         """
+        for layer in self._widgets.values():
+            for widget in layer:
+                widget._ui_manager = None
         self._widgets = {}
+        self._z_order = []
+        self._by_id = {}
+        self._updated_widgets = []
+        self._hit_test_grid = HitTestGrid()
 
     def update(self, dt):
         """
-        Updates every widget every frame
+        Updates every frame widgets which override update. Others react only
+        on events
         :param dt:
         :return:
         """
-        for _, layer in self._widgets.items():
-            for widget in layer:
-                widget.update(dt)
+        for widget in self._updated_widgets:
+            widget.update(dt)
 
     def draw(self, surface):
         """
-        Draws widget in appropriate Z order
+        Draws layers in appropriate Z order
         :param surface:
         :return:
         """
-        for z_key in sorted(self._widgets):
-            layer = self._widgets[z_key]
-            for widget in visible_widgets_iterator(layer):
-                widget.draw(surface)
+        for z_key in self._z_order:
+            self._widgets[z_key].draw(surface)
 
     def add_widget(self, widget):
         """
@@ -418,9 +803,17 @@ class UIManager(object):
         :return:
         """
         if widget.z not in self._widgets:
-            self._widgets[widget.z] = []
+            self._widgets[widget.z] = UILayer(
+                (int(self.window_size.x), int(self.window_size.y)))
+            bisect.insort(self._z_order, widget.z)
 
         self._widgets[widget.z].append(widget)
+        widget._ui_manager = self
+        self._hit_test_grid.add(widget)
+        if widget.widget_id is not None:
+            self._by_id.setdefault(widget.widget_id, widget)
+        if type(widget).update is not Widget.update:
+            self._updated_widgets.append(widget)
         for child in widget.children:
             self.add_widget(child)
 
@@ -430,24 +823,30 @@ class UIManager(object):
         :param widget:
         :return:
         """
-        if widget.z in self._widgets:
-            self._widgets[widget.z].remove(widget)
+        layer = self._widgets.get(widget.z)
+        if layer is not None:
+            layer.remove(widget)
+            if not layer.widgets:
+                del self._widgets[widget.z]
+                self._z_order.remove(widget.z)
+        widget._ui_manager = None
+        self._hit_test_grid.remove(widget)
+        if self._by_id.get(widget.widget_id) is widget:
+            del self._by_id[widget.widget_id]
+        if widget in self._updated_widgets:
+            self._updated_widgets.remove(widget)
 
         for child in widget.children:
             self.remove_widget(child)
 
     def get_by_id(self, widget_id):
         """
-        Returns widget with specified id
+        Returns widget with specified id. Id must be set before widget is
+        added
         :param widget_id:
         :return:
         """
-        for z_key in self._widgets:
-            layer = self._widgets[z_key]
-            for widget in layer:
-                if widget.widget_id == widget_id:
-                    return widget
-        return None
+        return self._by_id.get(widget_id)
 
     def process_event(self, event):
         """
@@ -468,9 +867,4 @@ class UIManager(object):
                 self._focused_widget.on_keyboard_event(event)
 
     def _get_colliding_widget(self, pos):
-        for z_key in sorted(self._widgets, reverse=True):
-            layer = self._widgets[z_key]
-            for widget in visible_widgets_iterator(layer):
-                if widget.rect.collidepoint(pos):
-                    return widget
-        return None
+        return self._hit_test_grid.widget_at(pos)
@@ -1,16 +1,35 @@
 """
 AI module
 """
+from enum import Enum
+
 from pytowerdefence.gameplay.Controllers import AttackController
 from pytowerdefence.gameplay.Objects import ActorState
 
 
+class Interest(Enum):
+    """
+    Declares which actors AI consumes from attack range. Visibility system
+    computes only those
+    """
+    ALL = 0
+    ENEMIES = 1
+    BASE = 2
+
+
 class BaseAI:
     """
-    Base class for AI
+    Base class for AI. AI is evaluated only after it was invalidated, e.g.
+    when actors enter or leave attack range
     """
+    __slots__ = ('_actor', '_dirty')
+
+    evaluations = 0
+    interest = Interest.ALL
+
     def __init__(self):
         self._actor = None
+        self._dirty = True
 
     def set_actor(self, actor):
         """
@@ -19,34 +38,139 @@ class BaseAI:
         :return:
         """
         self._actor = actor
+        self._dirty = True
+
+    def invalidate(self):
+        """
+        Request AI evaluation in nearest update
+        :return:
+        """
+        self._dirty = True
+
+    def on_range_changed(self, entered, exited):
+        """
+        Called by visibility system when actors enter or leave attack range
+        :param entered: set of actors which entered range
+        :param exited: set of actors which left range
+        :return:
+        """
+        self._dirty = True
 
     def update(self, dt):
         """
-        Update AI
+        Update AI. Does nothing when AI was not invalidated
         :param dt:
         :return:
         """
+        if self._dirty:
+            self._dirty = False
+            BaseAI.evaluations += 1
+            self.evaluate()
+
+    def evaluate(self):
+        """
+        Make AI decisions
+        :return:
+        """
         pass
 
 
+class TargetingPolicy(Enum):
+    """
+    Determines which visible enemy is chosen as a target
+    """
+    FIRST = 0
+    LAST = 1
+    STRONGEST = 2
+    WEAKEST = 3
+    CLOSEST = 4
+
+    def next(self):
+        """
+        Returns next policy, used to cycle through policies
+        :return:
+        """
+        policies = list(TargetingPolicy)
+        return policies[(policies.index(self) + 1) % len(policies)]
+
+
+def remaining_path_distance(actor):
+    """
+    Returns distance which actor still has to walk. Constant time thanks to
+    path arc-length tables and flow field distances
+    :param actor:
+    :return:
+    """
+    for controller in actor.controllers:
+        distance = controller.remaining_distance()
+        if distance is not None:
+            return distance
+    return float('inf')
+
+
 class StandardAI(BaseAI):
     """
-    Standard AI which attacks first visible enemy
+    Standard AI which attacks visible enemy chosen by targeting policy.
+    New target is chosen only when current one dies or leaves range
     """
-    def __init__(self, debug=False):
+    __slots__ = ('_debug', 'targeting', '_controller')
+
+    interest = Interest.ENEMIES
+
+    def __init__(self, debug=False, targeting=TargetingPolicy.FIRST):
         super().__init__()
         self._debug = debug
+        self.targeting = targeting
+        self._controller = None
 
-    def update(self, dt):
-        if self._actor.state != ActorState.DEATH:
-            for target in self._actor.actors_in_attack_range:
-                if self._target_filter(target):
-                    controller = self._actor.get_controller(AttackController)
-                    if controller is not None:
-                        if self._debug:
-                            print("Setting controller target to", target)
-                        controller.target = target
-                        break
+    def on_range_changed(self, entered, exited):
+        controller = self._attack_controller()
+        if controller is not None:
+            target = controller.target
+            if target is None or target in exited:
+                self._dirty = True
+
+    def evaluate(self):
+        if self._actor.state == ActorState.DEATH:
+            return
+
+        controller = self._attack_controller()
+        if controller is None:
+            return
+
+        target = controller.target
+        if target is None or not self._is_target_valid(target):
+            target = self._select_target()
+            if self._debug:
+                print("Setting controller target to", target)
+            controller.target = target
+
+    def _attack_controller(self):
+        if self._controller is None:
+            self._controller = self._actor.get_controller(AttackController)
+        return self._controller
+
+    def _is_target_valid(self, target):
+        return self._target_filter(target) \
+               and target in self._actor.actors_in_attack_range
+
+    def _select_target(self):
+        candidates = [target for target in self._actor.actors_in_attack_range
+                      if self._target_filter(target)]
+        if not candidates:
+            return None
+
+        if self.targeting == TargetingPolicy.FIRST:
+            return min(candidates, key=remaining_path_distance)
+        elif self.targeting == TargetingPolicy.LAST:
+            return max(candidates, key=remaining_path_distance)
+        elif self.targeting == TargetingPolicy.STRONGEST:
+            return max(candidates, key=lambda target: target.hp)
+        elif self.targeting == TargetingPolicy.WEAKEST:
+            return min(candidates, key=lambda target: target.hp)
+        position = self._actor.position
+        return min(candidates, key=lambda target:
+                   position.distance_squared_to(target.position))
 
     def _target_filter(self, target):
         return target.team != self._actor.team \
@@ -57,6 +181,9 @@ class AttackOnlyBase(StandardAI):
     """
     Monster attacks only base
     """
+    __slots__ = ()
+
+    interest = Interest.BASE
 
     def _target_filter(self, target):
         return super()._target_filter(target) \
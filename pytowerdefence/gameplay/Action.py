@@ -59,6 +59,14 @@ class BaseContinuousAction(BaseAction):
         """
         pass
 
+    def update(self, dt):
+        """
+        Called every frame while action is performed
+        :param dt:
+        :return:
+        """
+        pass
+
 
 class ScrollingAction(BaseContinuousAction):
     """
@@ -68,6 +76,7 @@ class ScrollingAction(BaseContinuousAction):
         super().__init__(action_manager)
         self._attack_range_drawer = AttackRangeDrawer()
         self._health_drawer = HealthDrawer()
+        self._hover_position = None
 
     def is_finished(self):
         return False
@@ -84,6 +93,7 @@ class ScrollingAction(BaseContinuousAction):
         :param event:
         :return:
         """
+        self._update_hover()
         if event.type == pygame.MOUSEBUTTONUP:
             if self._attack_range_drawer.actor is not None:
                 self._action_manager. \
@@ -92,12 +102,22 @@ class ScrollingAction(BaseContinuousAction):
 
     def on_mouse_motion_event(self, event):
         """
-        On mouse motion event
+        On mouse motion event. Only position is stored, hovered actor is
+        looked up at most once per frame
         :param event:
         :return:
         """
+        self._hover_position = event.pos
+
+    def update(self, dt):
+        self._update_hover()
+
+    def _update_hover(self):
+        if self._hover_position is None:
+            return
+        position, self._hover_position = self._hover_position, None
         actor = self._action_manager.level.get_actor_on_position(
-            Camera.to_world_position(event.pos))
+            Camera.to_world_position(position))
         if actor is not None and is_actor_in_player_team(actor):
             self._attack_range_drawer.actor = actor
             self._health_drawer.actor = None
@@ -183,6 +203,7 @@ class AddTowerAction(BaseContinuousAction):
         self._tower_cost = self._get_cost()
         self._finished = False
         self._colliding = True
+        self._placement_changed = False
         self._tower = None
         self._attack_range_drawer = None
 
@@ -218,6 +239,7 @@ class AddTowerAction(BaseContinuousAction):
         :param event:
         :return:
         """
+        self._update_placement()
         if not self._colliding:
             self._action_manager.logic_manager.game_state.player_gold -= self._tower_cost
             self._action_manager.level.add(self._tower)
@@ -229,13 +251,23 @@ class AddTowerAction(BaseContinuousAction):
 
     def on_mouse_motion_event(self, event):
         """
-        On mouse motion event
+        On mouse motion event. Tower follows mouse immediately, placement
+        is checked at most once per frame
         :param event:
         :return:
         """
         self._tower.position = Camera.to_world_position(event.pos)
-        self._colliding = self._action_manager.level.is_rectangle_colliding(
-            self._tower.rect)
+        self._placement_changed = True
+
+    def update(self, dt):
+        self._update_placement()
+
+    def _update_placement(self):
+        if self._placement_changed and self._tower is not None:
+            self._placement_changed = False
+            self._colliding = \
+                not self._action_manager.level.can_place_obstacle(
+                    self._tower.rect)
 
     def draw(self, surface):
         """
@@ -316,6 +348,8 @@ class ActionManager:
         if self._current_action is not None and \
                 self._current_action.is_finished():
             self.create_and_start_action("Scrolling")
+        if self._current_action is not None:
+            self._current_action.update(dt)
 
     def _perform_action(self, action, **kwargs):
         action.perform(**kwargs)
@@ -1,16 +1,16 @@
 """
 Controller module
 """
-from pygame.math import Vector2
-
+from pytowerdefence.gameplay.Navigation import ArcLengthPath
 from pytowerdefence.gameplay.Objects import Bullet, ActorState, \
-    add_effects_to_actor
+    add_effects_to_actor, weak_target, resolve_target
 
 
 class BaseController:
     """
     Base class for any controller
     """
+    __slots__ = ('_actor', '__weakref__')
 
     def __init__(self):
         self._actor = None
@@ -59,29 +59,41 @@ class BaseController:
         """
         pass
 
+    def remaining_distance(self):
+        """
+        Distance left to the end of actor movement. None if controller does
+        not move actor
+        :return:
+        """
+        return None
+
 
 class PathController(BaseController):
     """
-    Controller which drives monster at specific path
+    Controller which drives monster at specific path. Follower stores only
+    distance along path, position is taken from path arc-length table
     """
+    __slots__ = ('path', 'distance', '_segment', 'finished')
 
     def __init__(self):
         super().__init__()
         self.path = []
-        self._current_path_point = 0
+        self.distance = 0.
+        self._segment = 0
         self.finished = False
-        self.path_vector = Vector2()
 
     def set_path(self, path):
         """
         Set path
-        :param path:
+        :param path: ArcLengthPath or list of points
         :return:
         """
+        if not isinstance(path, ArcLengthPath):
+            path = ArcLengthPath(path)
         self.path = path
-        self._current_path_point = 0
-        self.finished = False
-        self._on_path_point_change()
+        self.distance = 0.
+        self._segment = 0
+        self.finished = path.length <= 0
 
     @property
     def current_path_point(self):
@@ -89,51 +101,110 @@ class PathController(BaseController):
         Current path point which is the target
         :return:
         """
-        return self._current_path_point
+        return self._segment + 1
 
     @current_path_point.setter
     def current_path_point(self, value):
-        self._current_path_point = value
-        self._on_path_point_change()
+        self._segment = max(value - 1, 0)
+        self.distance = self.path.lengths[self._segment]
 
     def need_update(self):
         return self.path and not self.finished
 
     def update(self, dt):
-        self._actor.go_to_direction(
-            self.path[self._current_path_point] - self._actor.position)
-        to_goal_vector = self._actor.position - self.path[
-            self._current_path_point]
-        dot = self.path_vector.dot(to_goal_vector)
-        if dot < 0:
-            self._current_path_point += 1
-            if self._current_path_point >= len(self.path):
-                self.finished = True
-                self._actor.stop()
-            else:
-                self._on_path_point_change()
+        actor = self._actor
+        if actor.state != ActorState.MOVE:
+            actor.change_state(ActorState.MOVE)
+            actor.rotate_to_direction(self.path.directions[self._segment])
+
+        self.distance += actor.statistics.speed * dt
+        if self.distance >= self.path.length:
+            self.distance = self.path.length
+            self.finished = True
+
+        segment = self.path.segment_at(self.distance, self._segment)
+        if segment != self._segment:
+            self._segment = segment
+            actor.rotate_to_direction(self.path.directions[segment])
+        actor.position = self.path.position_at(self.distance, segment,
+                                               actor.position)
+
+        if self.finished:
+            actor.stop()
 
     def on_update_end(self):
         self._actor.zero_velocity()
 
-    def set_actor(self, actor):
-        super().set_actor(actor)
-        self._on_path_point_change()
+    def stop(self):
+        super().stop()
+        self.finished = True
+
+    def remaining_distance(self):
+        if not self.path:
+            return None
+        return self.path.length - self.distance
+
+
+class FlowFieldController(BaseController):
+    """
+    Controller which steers monster toward base using level flow field.
+    Direction is looked up only when monster enters new cell or field
+    changes
+    """
+    __slots__ = ('flow_field', '_cell', '_version', 'finished')
+
+    def __init__(self, flow_field):
+        super().__init__()
+        self.flow_field = flow_field
+        self._cell = -1
+        self._version = -1
+        self.finished = False
+
+    def need_update(self):
+        return self.flow_field is not None and not self.finished
+
+    def update(self, dt):
+        actor = self._actor
+        flow_field = self.flow_field
+        cell = flow_field.nearest_cell(actor.position)
+        if cell == self._cell and actor.state == ActorState.MOVE \
+                and flow_field.version == self._version:
+            return
+
+        self._cell = cell
+        self._version = flow_field.version
+        direction = flow_field.direction_of(cell)
+        if direction is None and flow_field.is_blocked(cell):
+            # obstacle was placed over actor, leave it
+            direction = flow_field.escape_direction(cell)
+        if direction is not None:
+            actor.velocity = direction * actor.statistics.speed
+            actor.change_state(ActorState.MOVE)
+        elif flow_field.is_goal(cell):
+            self.finished = True
+            actor.stop()
+        else:
+            # no way to the goal, wait until it is opened again
+            actor.stop()
+
+    def on_update_end(self):
+        self._cell = -1
+        self._actor.zero_velocity()
 
     def stop(self):
         super().stop()
         self.finished = True
 
-    def _on_path_point_change(self):
-        if len(self.path) > 0:
-            self.path_vector = self._actor.position - self.path[
-                self._current_path_point]
+    def remaining_distance(self):
+        cell = self.flow_field.nearest_cell(self._actor.position)
+        return self.flow_field.distances[cell] * self.flow_field.cell_width
 
 
 class AttackController(BaseController):
     """
     Standard attack controller
     """
+    __slots__ = ('_target',)
 
     def __init__(self):
         super().__init__()
@@ -142,50 +213,86 @@ class AttackController(BaseController):
     @property
     def target(self):
         """
-        Target
+        Target. Controller holds only weak reference to it
         :return:
         """
-        return self._target
+        return resolve_target(self._target)
 
     @target.setter
     def target(self, value):
-        self._target = value
-        if self._actor.state != ActorState.ATTACK:
-            if self._target in self._actor.actors_in_attack_range:
-                self._on_target_in_range()
-
-    def _on_target_in_range(self):
+        previous = resolve_target(self._target)
+        if previous is not value:
+            if previous is not None:
+                previous.remove_tracker(self)
+            if value is not None:
+                value.add_tracker(self)
+        self._target = weak_target(value)
+        if value is None:
+            if self._actor.state == ActorState.ATTACK:
+                self._actor.change_state(ActorState.IDLE)
+        else:
+            self._engage(value)
+
+    def on_target_lost(self, target):
+        """
+        Called when target died
+        :param target:
+        :return:
+        """
+        self._target = None
+        if self._actor.state == ActorState.ATTACK:
+            self._actor.change_state(ActorState.IDLE)
+        if self._actor.ai is not None:
+            self._actor.ai.invalidate()
+
+    def _engage(self, target):
+        if self._actor.state != ActorState.ATTACK \
+                and self._actor.state != ActorState.DEATH \
+                and target in self._actor.actors_in_attack_range:
+            self._on_target_in_range(target)
+
+    def _on_target_in_range(self, target):
         self._actor.rotate_to_direction(
-            self._target.position - self._actor.position)
+            target.position - self._actor.position)
         self._actor.change_state(ActorState.ATTACK)
         self._actor.zero_velocity()
 
     def need_update(self):
+        if self._actor.state != ActorState.ATTACK:
+            target = self.target
+            if target is not None:
+                self._engage(target)
         return self._actor.state == ActorState.ATTACK
 
-    def _process_animation_end(self):
-        add_effects_to_actor(self._target, self._actor.statistics.hit_effects)
+    def _process_animation_end(self, target):
+        add_effects_to_actor(target, self._actor.statistics.hit_effects)
         self._actor.change_state(ActorState.IDLE)
 
     def on_animation_end(self):
-        if self._target is not None:
-            self._process_animation_end()
+        target = self.target
+        if target is not None:
+            self._process_animation_end(target)
+
+    def stop(self):
+        super().stop()
+        self.target = None
 
 
 class RangeAttackController(AttackController):
     """
     Controller for range attack
     """
+    __slots__ = ('_bullet',)
 
     def __init__(self):
         super().__init__()
         self._bullet = None
 
-    def _process_animation_end(self):
+    def _process_animation_end(self, target):
         if self._bullet is None or not self._bullet.alive:
             self._bullet = Bullet(self._actor)
             self._bullet.position = self._actor.position
-            self._bullet.target = self._target
+            self._bullet.target = target
             self._actor.objects_to_create.append(self._bullet)
 
 
@@ -193,8 +300,9 @@ class NotRotatingRangeAttackController(RangeAttackController):
     """
     Range attack controller, which won't turn toward target
     """
+    __slots__ = ()
 
-    def _on_target_in_range(self):
+    def _on_target_in_range(self, target):
         self._actor.change_state(ActorState.ATTACK)
 
 
@@ -202,6 +310,7 @@ class DeathController(BaseController):
     """
     Death controller
     """
+    __slots__ = ()
 
     def need_update(self):
         return self._actor.state == ActorState.DEATH
@@ -7,13 +7,17 @@ from pygame.math import Vector2
 
 from pytowerdefence.Phase import Phase
 from pytowerdefence.Resource import ResourceManager, ResourceClass
+from pytowerdefence.Scheduler import SystemScheduler
 from pytowerdefence.UI import PositionAttachType, Button, Text
 from pytowerdefence.gameplay.Action import ActionManager
 from pytowerdefence.gameplay.Logic import LogicManager, WaveManager
-from pytowerdefence.gameplay.LogicalEffects import LogicEffectManager
-from pytowerdefence.gameplay.Scene import Level, CreaturesFactory
+from pytowerdefence.gameplay.LogicalEffects import LogicEffectManager, \
+    LogicalEffectBase
+from pytowerdefence.gameplay.Objects import Actor
+from pytowerdefence.gameplay.Scene import Level, CreaturesFactory, \
+    is_actor_in_player_team
 from pytowerdefence.gameplay.Widgets import GameWindow, GameActionButton, \
-    GuardianPanel, PlayerInfoPanel, PlayerHealthPanel
+    GuardianPanel, PlayerInfoPanel, PlayerHealthPanel, PerformanceHud
 
 
 class GamePhase(Phase):
@@ -21,6 +25,8 @@ class GamePhase(Phase):
     Game phase
     """
     LEVEL_REQUIRED_PROPERTIES = ['map_file', 'wave_file', 'start_properties']
+    VISIBILITY_RATE = 20
+    EFFECTS_RATE = 20
 
     def __init__(self, app, ui_manager):
         super().__init__(app, ui_manager)
@@ -32,6 +38,16 @@ class GamePhase(Phase):
         self._logic_manager = None
         self._logical_effect_manager = None
         self._level_data = None
+        self._scheduler = SystemScheduler()
+        self._counter_totals = {}
+
+    @property
+    def scheduler(self):
+        """
+        Scheduler of gameplay systems
+        :return:
+        """
+        return self._scheduler
 
     def initialise(self, **kwargs):
         self._load_level(kwargs['filename'])
@@ -52,10 +68,14 @@ class GamePhase(Phase):
                                              self._creatures_factory,
                                              self._logic_manager,
                                              self._ui_manager)
+        if self._app.sampling_mode == 'hotkey':
+            # in app and game modes capture must not be stopped by F9
+            self._game_window.sampling_profiler = self._app.sampling_profiler
         self._ui_manager.add_widget(self._game_window)
         self._ui_manager.focus_widget(self._game_window)
 
         self._logical_effect_manager = LogicEffectManager(self.level)
+        self._add_systems()
 
         add_button = GameActionButton(
             img=ResourceManager.load_image(ResourceClass.UI, 'add-button.png'),
@@ -73,6 +93,28 @@ class GamePhase(Phase):
         health_panel.position = Vector2(self._ui_manager.window_size.x / 2, 35)
         self._ui_manager.add_widget(health_panel)
 
+        performance_hud = PerformanceHud(self.level, self._scheduler,
+                                         self._app.gc_monitor)
+        performance_hud.position = Vector2(
+            self._ui_manager.window_size.x - PerformanceHud.WIDTH - 8, 8)
+        self._ui_manager.add_widget(performance_hud)
+        self._game_window.performance_hud = performance_hud
+
+        gc_policy = self._app.gc_policy
+        if gc_policy is not None:
+            gc_policy.enable()
+            gc_policy.freeze()
+
+    def _add_systems(self):
+        self._scheduler.add('waves', self._wave_manager.update)
+        self._scheduler.add('movement', self.level.update_objects)
+        self._scheduler.add('visibility', self.level.update_visibility,
+                            GamePhase.VISIBILITY_RATE)
+        self._scheduler.add('logic', self._logic_manager.update)
+        self._scheduler.add('actions', self._action_manager.update)
+        self._scheduler.add('effects', self._logical_effect_manager.update,
+                            GamePhase.EFFECTS_RATE)
+
     def _load_level(self, filename):
         with open(filename) as file_data:
             self._level_data = json.load(file_data)
@@ -81,18 +123,50 @@ class GamePhase(Phase):
                 raise ValueError("Not all required properties provided!")
 
     def update(self, dt):
-        if self._wave_manager is not None:
-            self._wave_manager.update(dt)
-        self.level.update(dt)
-        self._logic_manager.update(dt)
-        self._action_manager.update(dt)
-        self._logical_effect_manager.update(dt)
+        self._scheduler.update(dt)
+
+        gc_policy = self._app.gc_policy
+        if gc_policy is not None and gc_policy.collection_due \
+                and self._is_between_waves():
+            gc_policy.on_idle()
+
+    def _is_between_waves(self):
+        if self._wave_manager.is_spawning():
+            return False
+        return not any(isinstance(obj, Actor)
+                       and not is_actor_in_player_team(obj)
+                       for obj in self.level.group)
+
+    def profile_label(self):
+        if self._wave_manager is None:
+            return None
+        return 'wave-{0}'.format(self._wave_manager.current_wave)
+
+    def collect_stats(self, profiler):
+        for system in self._scheduler.systems:
+            profiler.add_time('update.' + system.name, system.last_duration)
+        for name, value in self.level.entity_counts().items():
+            profiler.set_count(name, value)
+        profiler.set_count('ai_evaluations', self.level.ai_evaluations)
+        for name, value in self._counter_deltas().items():
+            profiler.set_count(name, value)
+
+    def _counter_deltas(self):
+        totals = {'spawns': self.level.objects_added,
+                  'effects_created': LogicalEffectBase.created,
+                  'assets_loaded': ResourceManager.loads}
+        deltas = {name: total - self._counter_totals.get(name, 0)
+                  for name, total in totals.items()}
+        self._counter_totals = totals
+        return deltas
 
     def draw(self, surface):
         self.level.draw(surface)
 
     def on_destroy(self):
         self._ui_manager.clear_all_widgets()
+        if self._app.gc_policy is not None:
+            self._app.gc_policy.disable()
 
 
 class GameEndPhase(Phase):
@@ -2,9 +2,9 @@
 Graphics elements
 """
 import pygame
+from pygame.math import Vector2
 
 from pytowerdefence.Resource import ResourceManager, ResourceClass
-from pytowerdefence.Utils import half_size_of_rect
 from pytowerdefence.gameplay.Scene import Camera
 
 
@@ -17,6 +17,7 @@ class AttackRangeDrawer:
         self._color = color
         self._surface = None
         self._attack_range = None
+        self._screen_position = Vector2()
 
         self.actor = actor
 
@@ -66,12 +67,14 @@ class AttackRangeDrawer:
             if self._attack_range != self._compute_attack_range():
                 self._refresh()
 
-            on_screen_pos = Camera.to_screen_position(self._actor.position)
+            on_screen_pos = Camera.to_screen_position(self._actor.position,
+                                                      self._screen_position)
             surface.blit(self._surface,
-                         [on_screen_pos.x - self._attack_range,
-                          on_screen_pos.y - self._attack_range])
+                         (on_screen_pos.x - self._attack_range,
+                          on_screen_pos.y - self._attack_range))
             surface.blit(self._actor.image,
-                         Camera.to_screen_position(self._actor.rect.topleft))
+                         Camera.to_screen_position(self._actor.rect.topleft,
+                                                   self._screen_position))
 
     @property
     def color(self):
@@ -117,6 +120,8 @@ class HealthDrawer:
             ResourceClass.UI, 'health-bar-background.png')
         self._progress = ProgressBarDrawer(ResourceManager.load_image(
             ResourceClass.UI, 'health-bar.png'))
+        self._rect = self._background.get_rect()
+        self._screen_position = Vector2()
 
     @property
     def actor(self):
@@ -140,10 +145,13 @@ class HealthDrawer:
             statistics = self.actor.statistics
             percentage = self.actor.hp / statistics.max_health
 
-            rect = self._background.get_rect()
-            rect.center = Camera.to_screen_position(self.actor.position) \
-                      - half_size_of_rect(self.actor.rect) \
-                      + half_size_of_rect(self._background.get_rect()) - (0, 10)
+            rect = self._rect
+            actor_rect = self.actor.rect
+            position = Camera.to_screen_position(self.actor.position,
+                                                 self._screen_position)
+            rect.center = (
+                position.x + (rect.width - actor_rect.width) / 2.0,
+                position.y + (rect.height - actor_rect.height) / 2.0 - 10)
 
             surface.blit(self._background, rect)
             self._progress.draw(surface, rect, percentage)
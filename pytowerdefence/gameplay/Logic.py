@@ -1,9 +1,12 @@
 """
 Common game logic module
 """
+import bisect
 import json
+from enum import Enum
 
-from pytowerdefence.gameplay.Controllers import PathController
+from pytowerdefence.gameplay.Controllers import PathController, \
+    FlowFieldController
 from pytowerdefence.gameplay.Objects import Actor, ActorCallback, EvolvingActor
 from pytowerdefence.gameplay.Scene import is_actor_in_player_team
 
@@ -60,6 +63,15 @@ class StandardWave:
     def _get_object_template(self, index):
         return self._objects[0]
 
+    @property
+    def end_time(self):
+        """
+        Time when last object of wave is created
+        :return:
+        """
+        return self._start_time + self._object_creation_interval * max(
+            self._number_of_objects - 1, 0)
+
 
 class WaveManager:
     """
@@ -73,6 +85,8 @@ class WaveManager:
         self._last_wave_index = 0
         self._creatures_factory = factory
         self._monsters_created = 0
+        self._start_times = []
+        self._end_time = 0.
 
     @property
     def monsters_created(self):
@@ -82,6 +96,22 @@ class WaveManager:
         """
         return self._monsters_created
 
+    @property
+    def end_time(self):
+        """
+        Time when last monster of last wave is created
+        :return:
+        """
+        return self._end_time
+
+    @property
+    def current_wave(self):
+        """
+        Number of waves which already started
+        :return:
+        """
+        return bisect.bisect_right(self._start_times, self._time_elapsed)
+
     def load(self, filename):
         """
         Load waves from json file
@@ -89,9 +119,17 @@ class WaveManager:
         :return:
         """
         with open(filename) as file_data:
-            self._data = json.load(file_data)
-            self._load_waves()
-            self._last_wave_index = 0
+            self.load_data(json.load(file_data))
+
+    def load_data(self, data):
+        """
+        Load waves from already parsed data
+        :param data:
+        :return:
+        """
+        self._data = data
+        self._load_waves()
+        self._last_wave_index = 0
 
     def update(self, dt):
         """
@@ -110,6 +148,13 @@ class WaveManager:
 
         self._waves = [wave for wave in self._waves if not wave.is_finished()]
 
+    def is_spawning(self):
+        """
+        Returns True if any started wave still creates monsters
+        :return:
+        """
+        return any(wave.should_run(self._time_elapsed) for wave in self._waves)
+
     def no_waves_left(self):
         """
         Returns true if there is no waves left
@@ -125,30 +170,121 @@ class WaveManager:
             path = level.paths[object_template["path"]]
             if path_controller is not None and path is not None:
                 monster.position = path[0]
-
-                path_controller.set_path(path)
-                path_controller.current_path_point = 1
+                if object_template.get("pathing") == "flow_field":
+                    monster.add_controller(
+                        FlowFieldController(level.flow_field))
+                else:
+                    path_controller.set_path(path)
 
     def _load_waves(self):
         self._waves = []
         sorted_waves = sorted(self._data["waves"],
                               key=lambda x: x["start_time"])
+        self._start_times = [wave["start_time"] for wave in sorted_waves]
         for wave in sorted_waves:
             if wave["type"] == "standard":
                 self._waves.append(StandardWave(wave))
             else:
                 raise RuntimeError("Unknown wave type!")
+        self._end_time = max((wave.end_time for wave in self._waves),
+                             default=0.)
+
+
+class GameStateEvent(Enum):
+    """
+    Game state change. Listeners are called with game state
+    """
+    GOLD_CHANGED = 0,
+    MONSTERS_KILLED_CHANGED = 1,
+    TIME_THRESHOLD = 2
 
 
 class GameState:
     """
-    Game state
+    Game state. Notifies listeners about changes, so nothing has to poll it
+    every frame
     """
 
     def __init__(self):
-        self.player_gold = 0
-        self.monsters_killed = 0
-        self.time_elapsed = 0
+        self._player_gold = 0
+        self._monsters_killed = 0
+        self._time_elapsed = 0
+        self._time_thresholds = []
+        self._listeners = {event: [] for event in GameStateEvent}
+
+    def add_listener(self, event, listener):
+        """
+        Registers listener called when event occurs
+        :param event: GameStateEvent
+        :param listener: function(game_state)
+        :return:
+        """
+        self._listeners[event].append(listener)
+
+    def remove_listener(self, event, listener):
+        """
+        Removes listener
+        :param event:
+        :param listener:
+        :return:
+        """
+        if listener in self._listeners[event]:
+            self._listeners[event].remove(listener)
+
+    def add_time_threshold(self, time):
+        """
+        TIME_THRESHOLD event is emitted once, when elapsed time exceeds time
+        :param time:
+        :return:
+        """
+        bisect.insort(self._time_thresholds, time)
+
+    def _notify(self, event):
+        for listener in list(self._listeners[event]):
+            listener(self)
+
+    @property
+    def player_gold(self):
+        """
+        Gold of player
+        :return:
+        """
+        return self._player_gold
+
+    @player_gold.setter
+    def player_gold(self, value):
+        if value != self._player_gold:
+            self._player_gold = value
+            self._notify(GameStateEvent.GOLD_CHANGED)
+
+    @property
+    def monsters_killed(self):
+        """
+        Number of killed monsters
+        :return:
+        """
+        return self._monsters_killed
+
+    @monsters_killed.setter
+    def monsters_killed(self, value):
+        if value != self._monsters_killed:
+            self._monsters_killed = value
+            self._notify(GameStateEvent.MONSTERS_KILLED_CHANGED)
+
+    @property
+    def time_elapsed(self):
+        """
+        Game time
+        :return:
+        """
+        return self._time_elapsed
+
+    @time_elapsed.setter
+    def time_elapsed(self, value):
+        self._time_elapsed = value
+        while self._time_thresholds and value > self._time_thresholds[0]:
+            self._time_thresholds.pop(0)
+            self._notify(GameStateEvent.TIME_THRESHOLD)
 
 
 class LogicManager:
@@ -159,6 +295,10 @@ class LogicManager:
     def __init__(self, start_properties, app):
         self.game_state = GameState()
         self.game_state.player_gold = start_properties['player_gold']
+        self.game_state.add_listener(GameStateEvent.MONSTERS_KILLED_CHANGED,
+                                     self._check_win)
+        self.game_state.add_listener(GameStateEvent.TIME_THRESHOLD,
+                                     self._check_win)
         self._app = app
         self._wave_manager = None
 
@@ -168,7 +308,15 @@ class LogicManager:
 
     @wave_manager.setter
     def wave_manager(self, value):
+        """
+        Sets wave manager. Win condition is also checked after last monster
+        is created, for levels where no monster is killed
+        :param value:
+        :return:
+        """
         self._wave_manager = value
+        if value is not None:
+            self.game_state.add_time_threshold(value.end_time)
 
     def on_object_added_to_scene(self, actor_object):
         """
@@ -212,8 +360,9 @@ class LogicManager:
         :param actor:
         :return:
         """
-        self.game_state.player_gold -= actor.get_current_evolution_cost()
+        cost = actor.get_current_evolution_cost()
         actor.evolve()
+        self.game_state.player_gold -= cost
 
     def update(self, dt):
         """
@@ -222,6 +371,10 @@ class LogicManager:
         :return:
         """
         self.game_state.time_elapsed += dt
-        if self._wave_manager.no_waves_left():
-            if self.game_state.monsters_killed >= self._wave_manager.monsters_created:
-                self._app.set_phase('game_end', won=True)
+
+    def _check_win(self, game_state):
+        if self._wave_manager is not None \
+                and self._wave_manager.no_waves_left() \
+                and game_state.monsters_killed >= \
+                self._wave_manager.monsters_created:
+            self._app.set_phase('game_end', won=True)
@@ -8,7 +8,11 @@ class LogicalEffectBase:
     """
     Base class for any logical effect
     """
+    __slots__ = ('_actor', 'name', 'is_unique')
+    created = 0
+
     def __init__(self, actor, name, is_unique):
+        LogicalEffectBase.created += 1
         self._actor = actor
         self.name = name
         self.is_unique = is_unique
@@ -58,6 +62,8 @@ class HitEffect(LogicalEffectBase):
     """
     Simply hit effect
     """
+    __slots__ = ('_damage',)
+
     def __init__(self, actor, **kwargs):
         super().__init__(actor, 'hit', False)
         self._damage = kwargs['damage']
@@ -70,6 +76,9 @@ class TimeEffect(LogicalEffectBase):
     """
     Base class for time lasting effects
     """
+    __slots__ = ('time', '_repeat', '_first_perform', '_repeat_time',
+                 '_to_next_repeat')
+
     def __init__(self, actor, name, is_unique, time, repeat_time=None,
                  repeat=False):
         super().__init__(actor, name, is_unique)
@@ -107,6 +116,8 @@ class SlowEffect(TimeEffect):
     """
     Slows actor speed
     """
+    __slots__ = ('speed_modifier',)
+
     def __init__(self, actor, **kwargs):
         super().__init__(actor, 'slow', True, kwargs['time'])
         self.speed_modifier = StatisticModifier(StatisticType.SPEED,
@@ -0,0 +1,390 @@
+"""
+Navigation module. Holds precomputed data used to move actors on the map
+"""
+import heapq
+import math
+from collections import deque
+
+from pygame.math import Vector2
+
+INFINITY = float('inf')
+
+NEIGHBOUR_OFFSETS = [(-1, 0, 1.), (1, 0, 1.), (0, -1, 1.), (0, 1, 1.),
+                     (-1, -1, math.sqrt(2)), (1, -1, math.sqrt(2)),
+                     (-1, 1, math.sqrt(2)), (1, 1, math.sqrt(2))]
+
+
+class ArcLengthPath:
+    """
+    Polyline path with precomputed cumulative arc-length table. Position of
+    follower is described by single scalar - distance from path start
+    """
+
+    def __init__(self, points):
+        self.points = [Vector2(point) for point in points]
+        self.lengths = [0.]
+        self.directions = []
+        for start, end in zip(self.points, self.points[1:]):
+            segment = end - start
+            length = segment.length()
+            self.lengths.append(self.lengths[-1] + length)
+            self.directions.append(segment / length if length > 0
+                                   else Vector2())
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+    def __iter__(self):
+        return iter(self.points)
+
+    @property
+    def length(self):
+        """
+        Total length of path
+        :return:
+        """
+        return self.lengths[-1]
+
+    def segment_at(self, distance, hint=0):
+        """
+        Returns index of segment, which contains point at given distance.
+        Search starts from hint, so for followers which moves forward
+        lookup is constant time
+        :param distance:
+        :param hint: previously returned segment
+        :return:
+        """
+        last = len(self.directions) - 1
+        if last < 0:
+            return 0
+        segment = min(max(hint, 0), last)
+        while segment < last and distance > self.lengths[segment + 1]:
+            segment += 1
+        while segment > 0 and distance < self.lengths[segment]:
+            segment -= 1
+        return segment
+
+    def position_at(self, distance, segment=None, out=None):
+        """
+        Returns position of point at given distance from path start
+        :param distance:
+        :param segment: segment containing distance, if already known
+        :param out: vector to write result to, instead of allocating new one
+        :return:
+        """
+        if out is None:
+            out = Vector2()
+        if not self.directions:
+            out.update(self.points[0])
+            return out
+        if segment is None:
+            segment = self.segment_at(distance)
+        point = self.points[segment]
+        direction = self.directions[segment]
+        offset = distance - self.lengths[segment]
+        out.update(point.x + direction.x * offset,
+                   point.y + direction.y * offset)
+        return out
+
+    def intervals_within(self, center, radius):
+        """
+        Returns sorted list of (start, end) distance intervals, where path is
+        closer to center than radius
+        :param center:
+        :param radius:
+        :return:
+        """
+        intervals = []
+        for index, direction in enumerate(self.directions):
+            offset = self.points[index] - center
+            half_b = direction.dot(offset)
+            discriminant = half_b * half_b - (offset.length_squared()
+                                              - radius * radius)
+            if discriminant <= 0:
+                continue
+            root = math.sqrt(discriminant)
+            segment_length = self.lengths[index + 1] - self.lengths[index]
+            enter = max(-half_b - root, 0.)
+            leave = min(-half_b + root, segment_length)
+            if enter >= leave:
+                continue
+            start = self.lengths[index] + enter
+            end = self.lengths[index] + leave
+            if intervals and start <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], end)
+            else:
+                intervals.append((start, end))
+        return intervals
+
+
+class FlowField:
+    """
+    Grid distance field toward goal cells (Dijkstra over 8-connected cells).
+    Every cell stores direction toward its next cell, so any number of
+    actors steers with single lookup per cell. Blocking cells repairs only
+    the region whose shortest paths went through them
+    """
+
+    def __init__(self, width, height, cell_width, cell_height=None):
+        self.width = width
+        self.height = height
+        self.cell_width = cell_width
+        self.cell_height = cell_height if cell_height is not None \
+            else cell_width
+        size = width * height
+        self.blocked = [False] * size
+        self.distances = [INFINITY] * size
+        self.next_cells = [-1] * size
+        self._goals = set()
+        self.version = 0
+        self._offset_directions = {
+            (dx, dy): Vector2(dx, dy).normalize()
+            for dx, dy, _ in NEIGHBOUR_OFFSETS}
+
+    def cell_at(self, position):
+        """
+        Returns index of cell containing position or -1 when outside of grid
+        :param position:
+        :return:
+        """
+        x = int(position[0] // self.cell_width)
+        y = int(position[1] // self.cell_height)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return -1
+
+    def nearest_cell(self, position):
+        """
+        Returns index of cell nearest to position, also outside of grid
+        :param position:
+        :return:
+        """
+        x = min(max(int(position[0] // self.cell_width), 0), self.width - 1)
+        y = min(max(int(position[1] // self.cell_height), 0), self.height - 1)
+        return y * self.width + x
+
+    def cells_in_rect(self, rect):
+        """
+        Returns indices of cells overlapped by rectangle
+        :param rect:
+        :return:
+        """
+        left = max(int(rect.left // self.cell_width), 0)
+        top = max(int(rect.top // self.cell_height), 0)
+        right = min(int((rect.right - 1) // self.cell_width), self.width - 1)
+        bottom = min(int((rect.bottom - 1) // self.cell_height),
+                     self.height - 1)
+        return [y * self.width + x for y in range(top, bottom + 1)
+                for x in range(left, right + 1)]
+
+    def is_goal(self, cell):
+        """
+        Returns True if cell is one of goal cells
+        :param cell:
+        :return:
+        """
+        return cell in self._goals
+
+    def is_blocked(self, cell):
+        """
+        Returns True if cell is blocked
+        :param cell:
+        :return:
+        """
+        return self.blocked[cell]
+
+    def direction_of(self, cell):
+        """
+        Returns unit vector toward next cell on shortest path to goal. None is
+        returned for goal, blocked and unreachable cells
+        :param cell:
+        :return:
+        """
+        if cell < 0:
+            return None
+        next_cell = self.next_cells[cell]
+        if next_cell < 0:
+            return None
+        return self._offset_directions[
+            (next_cell % self.width - cell % self.width,
+             next_cell // self.width - cell // self.width)]
+
+    def set_goal(self, rect):
+        """
+        Sets goal area and computes whole field
+        :param rect:
+        :return:
+        """
+        self._goals = set(self.cells_in_rect(rect))
+        self.compute()
+
+    def compute(self):
+        """
+        Computes distance field for whole grid
+        :return:
+        """
+        self.version += 1
+        size = self.width * self.height
+        self.distances = [INFINITY] * size
+        self.next_cells = [-1] * size
+        heap = []
+        for goal in self._goals:
+            self.distances[goal] = 0.
+            heap.append((0., goal))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def block(self, rect):
+        """
+        Blocks cells overlapped by rectangle and repairs affected region
+        :param rect:
+        :return:
+        """
+        self.block_cells(self.cells_in_rect(rect))
+
+    def block_cells(self, cells):
+        """
+        Blocks cells and repairs only cells, whose path led through them
+        :param cells:
+        :return:
+        """
+        newly_blocked = [cell for cell in cells
+                         if not self.blocked[cell] and cell not in self._goals]
+        if not newly_blocked:
+            return
+
+        self.version += 1
+        for cell in newly_blocked:
+            self.blocked[cell] = True
+
+        affected = set(newly_blocked)
+        stack = list(newly_blocked)
+        while stack:
+            cell = stack.pop()
+            for neighbour, _ in self._neighbours(cell, free_only=False):
+                if neighbour not in affected \
+                        and self._path_uses_cell(neighbour, cell):
+                    affected.add(neighbour)
+                    stack.append(neighbour)
+
+        for cell in affected:
+            self.distances[cell] = INFINITY
+            self.next_cells[cell] = -1
+
+        heap = []
+        for cell in affected:
+            if self.blocked[cell]:
+                continue
+            for neighbour, cost in self._neighbours(cell):
+                if neighbour in affected:
+                    continue
+                distance = self.distances[neighbour] + cost
+                if distance < self.distances[cell]:
+                    self.distances[cell] = distance
+                    self.next_cells[cell] = neighbour
+            if self.distances[cell] < INFINITY:
+                heap.append((self.distances[cell], cell))
+        heapq.heapify(heap)
+        self._propagate(heap)
+
+    def keeps_reachable(self, rect, cells):
+        """
+        Returns True if blocking cells overlapped by rectangle leaves route
+        to goal from every given cell, which is reachable now. Cell covered
+        by rectangle keeps route when any free neighbour has one. Blocking
+        is only tentative: breadth first search from goals treats covered
+        cells as blocked, field is not changed
+        :param rect:
+        :param cells:
+        :return:
+        """
+        extra_blocked = {cell for cell in self.cells_in_rect(rect)
+                         if not self.blocked[cell]
+                         and cell not in self._goals}
+        reachable = [cell for cell in cells if self.distances[cell] < INFINITY]
+        if not extra_blocked or not reachable:
+            return True
+
+        reached = set(self._goals)
+        queue = deque(self._goals)
+        while queue:
+            cell = queue.popleft()
+            for neighbour, _ in self._neighbours(cell, True, extra_blocked):
+                if neighbour not in reached:
+                    reached.add(neighbour)
+                    queue.append(neighbour)
+
+        for cell in reachable:
+            if cell in extra_blocked:
+                if not any(neighbour in reached for neighbour, _ in
+                           self._neighbours(cell, True, extra_blocked)):
+                    return False
+            elif cell not in reached:
+                return False
+        return True
+
+    def escape_direction(self, cell):
+        """
+        Returns unit vector toward cheapest free neighbour of blocked cell,
+        used by actors standing on obstacle placed over them. None is
+        returned when no neighbour has route to goal
+        :param cell:
+        :return:
+        """
+        best, best_distance = -1, INFINITY
+        for neighbour, cost in self._neighbours(cell):
+            distance = self.distances[neighbour] + cost
+            if distance < best_distance:
+                best, best_distance = neighbour, distance
+        if best < 0:
+            return None
+        return self._offset_directions[
+            (best % self.width - cell % self.width,
+             best // self.width - cell // self.width)]
+
+    def _propagate(self, heap):
+        distances = self.distances
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+            for neighbour, cost in self._neighbours(cell):
+                new_distance = distance + cost
+                if new_distance < distances[neighbour]:
+                    distances[neighbour] = new_distance
+                    self.next_cells[neighbour] = cell
+                    heapq.heappush(heap, (new_distance, neighbour))
+
+    def _path_uses_cell(self, cell, used_cell):
+        next_cell = self.next_cells[cell]
+        if next_cell < 0:
+            return False
+        if next_cell == used_cell:
+            return True
+        # diagonal move is allowed only when both side cells are free
+        x, y = cell % self.width, cell // self.width
+        next_x, next_y = next_cell % self.width, next_cell // self.width
+        return x != next_x and y != next_y and used_cell in (
+            y * self.width + next_x, next_y * self.width + x)
+
+    def _neighbours(self, cell, free_only=True, extra_blocked=()):
+        x, y = cell % self.width, cell // self.width
+        blocked = self.blocked
+        for dx, dy, cost in NEIGHBOUR_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                continue
+            neighbour = ny * self.width + nx
+            if free_only:
+                if blocked[neighbour] or neighbour in extra_blocked:
+                    continue
+                if dx != 0 and dy != 0:
+                    side, other_side = y * self.width + nx, ny * self.width + x
+                    if blocked[side] or blocked[other_side] \
+                            or side in extra_blocked \
+                            or other_side in extra_blocked:
+                        continue
+            yield neighbour, cost
@@ -3,6 +3,7 @@ Objects module
 """
 import copy
 import importlib
+import weakref
 from collections import defaultdict
 from enum import Enum, IntEnum
 from functools import reduce
@@ -16,6 +17,7 @@ from pytowerdefence.Utils import rot_center
 
 ENEMY_TEAM = 0
 PLAYER_TEAM = 1
+UP = Vector2(0, -1)
 
 
 class ActorCallback(Enum):
@@ -26,10 +28,34 @@ class ActorCallback(Enum):
     EVOLVE = 1
 
 
+def weak_target(target):
+    """
+    Returns weak reference to target, or None when there is no target
+    :param target:
+    :return:
+    """
+    return weakref.ref(target) if target is not None else None
+
+
+def resolve_target(reference):
+    """
+    Returns object pointed by weak reference or None, when it was released
+    :param reference:
+    :return:
+    """
+    return reference() if reference is not None else None
+
+
 class GameObject(pygame.sprite.Sprite):
     """
     Base class for any game object, which can be drawed and updated
     """
+    # '_Sprite__g' holds groups of pygame sprite. Keeping it in a slot means
+    # instance __dict__ inherited from Sprite is never allocated
+    __slots__ = ('_Sprite__g', '_position', '_prev_position', '_velocity',
+                 '_rect', 'alive', 'image', '_sprite', '_angle', '_team',
+                 '_callbacks', '_rotated_source', '_rotated_angle')
+
     objects_to_create = []
 
     def __init__(self):
@@ -44,18 +70,37 @@ class GameObject(pygame.sprite.Sprite):
         self._angle = 0
         self._team = ENEMY_TEAM
         self._callbacks = {}
+        self._rotated_source = None
+        self._rotated_angle = 0
 
     def update(self, dt):
         """
-        Update method, updated every frame
+        Update method, updated every frame. Vectors are modified in place,
+        so steady movement does not allocate
         :param dt:
         :return:
         """
-        self._prev_position = Vector2(self._position)
-        self._position += (self._velocity * dt)
-        self._rect.center = self._position
+        position = self._position
+        velocity = self._velocity
+        self._prev_position.update(position)
+        position.x += velocity.x * dt
+        position.y += velocity.y * dt
+        self._rect.center = position
         if self._sprite is not None:
-            self.image = rot_center(self._sprite, self._angle)
+            self._rotate_image(self._sprite)
+
+    def _rotate_image(self, source):
+        """
+        Sets image to rotated source. Rotation is done only when source or
+        angle changed since last call
+        :param source:
+        :return:
+        """
+        if source is not self._rotated_source \
+                or self._angle != self._rotated_angle:
+            self._rotated_source = source
+            self._rotated_angle = self._angle
+            self.image = rot_center(source, self._angle)
 
     @property
     def team(self):
@@ -85,7 +130,7 @@ class GameObject(pygame.sprite.Sprite):
         :return:
         """
         self._sprite = value
-        self.image = rot_center(self._sprite, self._angle)
+        self._rotate_image(value)
 
     @property
     def velocity(self):
@@ -138,7 +183,7 @@ class GameObject(pygame.sprite.Sprite):
 
     @position.setter
     def position(self, value):
-        self._position = Vector2(value)
+        self._position.update(value)
         self._rect.center = self._position
 
     def set_callback(self, callback_type, callback):
@@ -164,7 +209,7 @@ class GameObject(pygame.sprite.Sprite):
         :param direction:
         :return:
         """
-        self._angle = direction.angle_to(Vector2(0, -1))
+        self._angle = direction.angle_to(UP)
 
     def kill(self):
         """
@@ -181,6 +226,7 @@ class Bullet(GameObject):
     """
     Class that represents bullet
     """
+    __slots__ = ('_target', '_owner', '_start_position', '_speed')
 
     def __init__(self, owner):
         super().__init__()
@@ -194,10 +240,10 @@ class Bullet(GameObject):
     @property
     def target(self):
         """
-        Target is an actor
+        Target is an actor. Bullet holds only weak reference to it
         :return: target
         """
-        return self._target
+        return resolve_target(self._target)
 
     @target.setter
     def target(self, val):
@@ -206,7 +252,21 @@ class Bullet(GameObject):
         :param val:
         :return:
         """
-        self._target = val
+        previous = resolve_target(self._target)
+        if previous is not None:
+            previous.remove_tracker(self)
+        self._target = weak_target(val)
+        if val is not None:
+            val.add_tracker(self)
+
+    def on_target_lost(self, target):
+        """
+        Called when target died. Orphaned bullet is dropped immediately
+        :param target:
+        :return:
+        """
+        self._target = None
+        self.kill()
 
     def update(self, dt):
         """
@@ -214,16 +274,26 @@ class Bullet(GameObject):
         :param dt:
         :return:
         """
+        target = self.target
+        if target is None:
+            self.kill()
+            return
+
         super().update(dt)
-        projection_vector = self._position - self._start_position
-        to_goal_vector = self._target.position - self._position
-        self.velocity = to_goal_vector.normalize() * self._speed
-        dot = projection_vector.dot(to_goal_vector)
+        position = self._position
+        start_position = self._start_position
+        velocity = self._velocity
+        velocity.update(target.position)
+        velocity -= position
+        dot = (position.x - start_position.x) * velocity.x \
+            + (position.y - start_position.y) * velocity.y
+        velocity.scale_to_length(self._speed)
+        self.rotate_to_direction(velocity)
         if dot < 0:
-            self._on_hit()
+            self._on_hit(target)
 
-    def _on_hit(self):
-        add_effects_to_actor(self._target, self._owner.statistics.hit_effects)
+    def _on_hit(self, target):
+        add_effects_to_actor(target, self._owner.statistics.hit_effects)
         self._owner.change_state(ActorState.IDLE)
         self.kill()
 
@@ -255,6 +325,8 @@ class StatisticModifier:
     """
     Modifer of statistics
     """
+    __slots__ = ('statistic_type', 'value', 'multiply')
+
     def __init__(self, statistic_type, value, multiply=False):
         self.statistic_type = statistic_type
         self.value = value
@@ -279,6 +351,8 @@ class ActorStatistics:
     """
     Actor statistics class.
     """
+    __slots__ = ('_values', '_readonly')
+
     def __init__(self, readonly=False):
         self._values = [None] * len(StatisticType)
         self._readonly = readonly
@@ -420,6 +494,12 @@ class Actor(GameObject):
     """
     Base class for any oactor on scene
     """
+    __slots__ = ('_animations', '_current_animation', '_controllers',
+                 '_statistic_modifiers', '_state', '_base_statistics',
+                 '_statistics', '_modifiers', '_actors_in_attack_range', '_ai',
+                 '_prev_updated_controller', '_hp', '_logical_effects',
+                 '_class_properties', '_trackers')
+
     def __init__(self, class_properties):
         super().__init__()
         self._animations = {}
@@ -430,12 +510,13 @@ class Actor(GameObject):
         self._base_statistics = ActorStatistics()
         self._statistics = ActorStatistics(readonly=True)
         self._modifiers = []
-        self._actors_in_attack_range = []
+        self._actors_in_attack_range = set()
         self._ai = None
         self._prev_updated_controller = None
         self._hp = 0
         self._logical_effects = []
         self._class_properties = class_properties
+        self._trackers = weakref.WeakSet()
 
     @property
     def class_properties(self):
@@ -458,8 +539,7 @@ class Actor(GameObject):
 
         super().update(dt)
         if self._current_animation is not None and self._sprite is None:
-            self.image = rot_center(self._current_animation.getCurrentFrame(),
-                                    self._angle)
+            self._rotate_image(self._current_animation.getCurrentFrame())
             if self._current_animation.isFinished():
                 for controller in self._controllers:
                     controller.on_animation_end()
@@ -547,6 +627,40 @@ class Actor(GameObject):
         self.stop_controllers()
         self._velocity = Vector2()
         self.change_state(ActorState.DEATH)
+        self._actors_in_attack_range = set()
+        self.notify_trackers()
+
+    def add_tracker(self, tracker):
+        """
+        Registers object (bullet, controller) which aims at this actor.
+        Tracker must implement on_target_lost(actor)
+        :param tracker:
+        :return:
+        """
+        self._trackers.add(tracker)
+
+    def remove_tracker(self, tracker):
+        """
+        Unregisters object which no longer aims at this actor
+        :param tracker:
+        :return:
+        """
+        self._trackers.discard(tracker)
+
+    def notify_trackers(self):
+        """
+        Invalidates, in one batch, every object which aims at this actor
+        :return:
+        """
+        trackers = list(self._trackers)
+        self._trackers.clear()
+        for tracker in trackers:
+            tracker.on_target_lost(self)
+
+    def kill(self):
+        self.notify_trackers()
+        self._actors_in_attack_range = set()
+        super().kill()
 
     def set_animation(self, state, animation):
         """
@@ -612,6 +726,14 @@ class Actor(GameObject):
         """
         return self._state
 
+    @property
+    def ai(self):
+        """
+        Actor AI
+        :return:
+        """
+        return self._ai
+
     def set_ai(self, value):
         """
         Sets AI
@@ -643,12 +765,12 @@ class Actor(GameObject):
         Zero velocity
         :return:
         """
-        self._velocity = Vector2()
+        self._velocity.update(0, 0)
 
     @property
     def actors_in_attack_range(self):
         """
-        Property that holds reference to any visible enemy
+        Property that holds set of actors in attack range
         :return:
         """
         return self._actors_in_attack_range
@@ -731,6 +853,9 @@ class EvolvingActor(Actor):
     """
     Actor which can be evolved/upgraded
     """
+    __slots__ = ('_current_evolution_level', '_evolution_statistics',
+                 '_evolution_animations', '_evolution_costs')
+
     def __init__(self, class_properties):
         super().__init__(class_properties)
         self._current_evolution_level = 0
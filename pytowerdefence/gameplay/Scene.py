@@ -1,19 +1,23 @@
 """
 Scene module
 """
+import bisect
 import importlib
 from contextlib import contextmanager
 
-import pygame
 from pygame.math import Vector2
 from pygame.rect import Rect
 from pyscroll import BufferedRenderer, TiledMapData
 from pyscroll.group import PyscrollGroup
 from pytmx.util_pygame import load_pygame
 
+from pytowerdefence.gameplay.AI import BaseAI, Interest
+from pytowerdefence.gameplay.Controllers import PathController, \
+    FlowFieldController
 from pytowerdefence.gameplay.Monsters import Base
+from pytowerdefence.gameplay.Navigation import ArcLengthPath, FlowField
 from pytowerdefence.gameplay.Objects import GameObject, Actor, ActorState, \
-    PLAYER_TEAM
+    Bullet, PLAYER_TEAM
 
 
 class Camera:
@@ -68,13 +72,170 @@ class Camera:
         return screen_position + cls._position - cls._half_screen_size
 
     @classmethod
-    def to_screen_position(cls, world_position):
+    def to_screen_position(cls, world_position, out=None):
         """
         Returns screen position
         :param world_position:
+        :param out: vector to write result to, instead of allocating new one
         :return:
         """
-        return world_position - cls._position + cls._half_screen_size
+        if out is None:
+            return world_position - cls._position + cls._half_screen_size
+        out.update(world_position)
+        out -= cls._position
+        out += cls._half_screen_size
+        return out
+
+
+class TowerCoverage:
+    """
+    Precomputed path intervals covered by attack range of static actors
+    (towers). Path followers get towers which have them in range by lookup
+    of their path distance, without any 2D distance math. Intervals are
+    recomputed only when tower is added, removed or its range changes
+    """
+
+    def __init__(self):
+        self._towers = {}
+        self._tables = {}
+
+    def __contains__(self, actor):
+        return actor in self._towers
+
+    def add(self, tower):
+        """
+        Adds static actor
+        :param tower:
+        :return:
+        """
+        self._towers[tower] = None
+        self._tables.clear()
+
+    def refresh(self):
+        """
+        Drops killed towers and invalidates intervals, when any tower range
+        changed (e.g. after evolution)
+        :return:
+        """
+        changed = False
+        for tower, tower_range in list(self._towers.items()):
+            if not tower.alive:
+                del self._towers[tower]
+                changed = True
+                continue
+            current_range = tower.statistics.attack_range + tower.radius
+            if current_range != tower_range:
+                self._towers[tower] = current_range
+                changed = True
+        if changed:
+            self._tables.clear()
+
+    def towers_at(self, path, follower_radius, distance):
+        """
+        Returns towers which have follower at given path distance in range
+        :param path: ArcLengthPath
+        :param follower_radius:
+        :param distance:
+        :return:
+        """
+        key = (path, follower_radius)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = self._build_table(path,
+                                                          follower_radius)
+        bounds, covering = table
+        index = bisect.bisect_right(bounds, distance) - 1
+        if 0 <= index < len(covering):
+            return covering[index]
+        return ()
+
+    def _build_table(self, path, follower_radius):
+        intervals = [(tower, interval)
+                     for tower, tower_range in self._towers.items()
+                     for interval in path.intervals_within(
+                         tower.position, tower_range + follower_radius)]
+        bounds = sorted({value for _, interval in intervals
+                         for value in interval})
+        covering = [tuple(tower for tower, (start, end) in intervals
+                          if start <= low and high <= end)
+                    for low, high in zip(bounds, bounds[1:])]
+        return bounds, covering
+
+
+class VisibilitySystem:
+    """
+    Computes set of actors in attack range of every actor, and notifies AI
+    about actors which entered or left that range. Only actors declared by
+    AI interest are checked, e.g. base attackers check single distance.
+    Towers find path followers by coverage intervals
+    """
+
+    def __init__(self):
+        self.coverage = TowerCoverage()
+
+    def update(self, actors, base=None):
+        """
+        Recompute attack ranges
+        :param actors:
+        :param base:
+        :return:
+        """
+        alive = [actor for actor in actors if actor.state != ActorState.DEATH]
+        teams = {}
+        for actor in alive:
+            teams.setdefault(actor.team, []).append(actor)
+        enemies = {}
+        self.coverage.refresh()
+        covered, not_on_path = self._cover_path_followers(alive)
+
+        for actor in alive:
+            interest = actor.ai.interest if actor.ai is not None \
+                else Interest.ALL
+            if interest == Interest.BASE:
+                visible = set()
+                if base is not None and base.team != actor.team \
+                        and is_visible(actor, base):
+                    visible.add(base)
+            elif interest == Interest.ENEMIES and actor in self.coverage:
+                visible = {other for other in covered.get(actor, ())
+                           if other.team != actor.team}
+                visible.update(other for other in not_on_path
+                               if other.team != actor.team
+                               and is_visible(actor, other))
+            elif interest == Interest.ENEMIES:
+                if actor.team not in enemies:
+                    enemies[actor.team] = [
+                        other for team, members in teams.items()
+                        if team != actor.team for other in members]
+                visible = {other for other in enemies[actor.team]
+                           if is_visible(actor, other)}
+            else:
+                visible = {other for other in alive
+                           if is_visible(actor, other)}
+            self._set_visible(actor, visible)
+
+    def _cover_path_followers(self, alive):
+        covered = {}
+        not_on_path = []
+        for actor in alive:
+            controller = actor.get_controller(PathController)
+            if controller is None or not controller.path:
+                not_on_path.append(actor)
+                continue
+            for tower in self.coverage.towers_at(controller.path, actor.radius,
+                                                 controller.distance):
+                if tower is not actor:
+                    covered.setdefault(tower, []).append(actor)
+        return covered, not_on_path
+
+    @staticmethod
+    def _set_visible(actor, visible):
+        previous = actor.actors_in_attack_range
+        if visible != previous:
+            actor.actors_in_attack_range = visible
+            if actor.ai is not None:
+                actor.ai.on_range_changed(visible - previous,
+                                          previous - visible)
 
 
 class Level:
@@ -90,6 +251,11 @@ class Level:
         self.group = None
         self.paths = []
         self.base = None
+        self.flow_field = None
+        self.spawn_cells = []
+        self.visibility = VisibilitySystem()
+        self.ai_evaluations = 0
+        self.objects_added = 0
 
     def load(self, filename):
         """
@@ -104,7 +270,7 @@ class Level:
         self.group = PyscrollGroup(map_layer=self.map_layer)
         Camera.set_up(self.group, self.map_layer, self.screen_size)
         for obj in self.tmx_data.get_layer_by_name("paths"):
-            self.paths.append(obj.points)
+            self.paths.append(ArcLengthPath(obj.points))
 
         for obstacle in self.obstacle_iterator():
             obstacle.rect = Rect(obstacle.x, obstacle.y, obstacle.width,
@@ -116,6 +282,15 @@ class Level:
                 self.base.position = Vector2(actor.x, actor.y)
                 self.base.team = PLAYER_TEAM
                 self.add(self.base)
+                self.visibility.coverage.add(self.base)
+
+        self.flow_field = FlowField(self.tmx_data.width, self.tmx_data.height,
+                                    self.tmx_data.tilewidth,
+                                    self.tmx_data.tileheight)
+        if self.base is not None:
+            self.flow_field.set_goal(self.base.rect)
+        self.spawn_cells = [self.flow_field.nearest_cell(path[0])
+                            for path in self.paths if len(path) > 0]
 
     def add(self, obj):
         """
@@ -124,15 +299,21 @@ class Level:
         :return:
         """
         self.group.add(obj, layer=self.get_layer_index("actors"))
+        self.objects_added += 1
         self._logic_manager.on_object_added_to_scene(obj)
 
     def add_obstacle(self, obstacle):
         """
-        Add obstacle
+        Add obstacle. Obstacles added during game (towers) also block
+        flow field movement. Obstacles from map only forbid building
         :param obstacle:
         :return:
         """
         self.tmx_data.get_layer_by_name("obstacles").append(obstacle)
+        if self.flow_field is not None:
+            self.flow_field.block(obstacle.rect)
+        if isinstance(obstacle, Actor):
+            self.visibility.coverage.add(obstacle)
 
     def actor_iterator(self):
         """
@@ -151,6 +332,20 @@ class Level:
         for obstacle in self.tmx_data.get_layer_by_name("obstacles"):
             yield obstacle
 
+    def entity_counts(self):
+        """
+        Returns number of actors, bullets and logical effects on level
+        :return:
+        """
+        actors = bullets = effects = 0
+        for obj in self.group.sprites():
+            if isinstance(obj, Actor):
+                actors += 1
+                effects += len(obj.logical_effects)
+            elif isinstance(obj, Bullet):
+                bullets += 1
+        return {'actors': actors, 'bullets': bullets, 'effects': effects}
+
     def get_layer_index(self, layer_name):
         """
         Returns index of layer by name
@@ -173,6 +368,26 @@ class Level:
                 return True
         return False
 
+    def can_place_obstacle(self, rectangle):
+        """
+        Checks if obstacle can be placed on rect: it does not collide with
+        other obstacles, and monsters spawned on paths starts and flow field
+        monsters already on map still have way to the base
+        :param rectangle:
+        :return:
+        """
+        if self.is_rectangle_colliding(rectangle):
+            return False
+        if self.flow_field is None:
+            return True
+        cells = list(self.spawn_cells)
+        for actor in self.actor_iterator():
+            controller = actor.get_controller(FlowFieldController)
+            if controller is not None and controller.need_update() \
+                    and actor.state != ActorState.DEATH:
+                cells.append(self.flow_field.nearest_cell(actor.position))
+        return self.flow_field.keeps_reachable(rectangle, cells)
+
     def get_actor_on_position(self, position, lambda_filter=None):
         """
         Checks if given position collides with any actor and returns it
@@ -197,18 +412,33 @@ class Level:
         :param dt:
         :return:
         """
+        self.update_objects(dt)
+        self.update_visibility(dt)
+
+    def update_objects(self, dt):
+        """
+        Updates objects (AI, controllers, movement) and adds created objects
+        :param dt:
+        :return:
+        """
+        evaluations = BaseAI.evaluations
         self.group.update(dt)
-        for obj in self.actor_iterator():
-            if obj.state != ActorState.DEATH:
-                visible = pygame.sprite.spritecollide(obj, self.group.sprites(),
-                                                      False, is_visible)
-                obj.actors_in_attack_range = visible
+        self.ai_evaluations = BaseAI.evaluations - evaluations
 
         for new_object in GameObject.objects_to_create:
-            self.add(new_object)
+            if new_object.alive:
+                self.add(new_object)
 
         GameObject.objects_to_create.clear()
 
+    def update_visibility(self, dt):
+        """
+        Recomputes attack ranges, which triggers AI evaluations
+        :param dt:
+        :return:
+        """
+        self.visibility.update(self.actor_iterator(), self.base)
+
     def draw(self, surface):
         """
         Draw level objects
@@ -1,20 +1,28 @@
 """
 Widgets that are used in game
 """
+from collections import deque
+
 import pygame
 from pygame.math import Vector2
 
+from pytowerdefence.Profiler import percentile
 from pytowerdefence.Resource import ResourceManager, ResourceClass
-from pytowerdefence.UI import Button, Panel, Text, PositionAttachType, Widget
+from pytowerdefence.UI import Button, Panel, Text, PositionAttachType, \
+    TextCache, Widget
+from pytowerdefence.gameplay.AI import StandardAI, AttackOnlyBase
 from pytowerdefence.gameplay.Graphics import ProgressBarDrawer
+from pytowerdefence.gameplay.Logic import GameStateEvent
 from pytowerdefence.gameplay.Objects import ActorCallback
 from pytowerdefence.gameplay.Scene import Camera
 
 
 class GameWindow(Widget):
     """
-    Game window
+    Game window. Draws action mediator every frame
     """
+    retained = False
+
     def __init__(self, width, height):
         super().__init__()
         self.z = 0
@@ -23,6 +31,8 @@ class GameWindow(Widget):
         self.mediator = None
         self.camera_movement_speed = 128
         self._action_manager = None
+        self.performance_hud = None
+        self.sampling_profiler = None
 
     @property
     def action_manager(self):
@@ -56,6 +66,12 @@ class GameWindow(Widget):
         elif event.key == pygame.K_ESCAPE:
             if self._action_manager is not None:
                 self._action_manager.set_default_action()
+        elif event.key == pygame.K_F3:
+            if self.performance_hud is not None:
+                self.performance_hud.visible = not self.performance_hud.visible
+        elif event.key == pygame.K_F9:
+            if self.sampling_profiler is not None:
+                self.sampling_profiler.toggle()
 
     def _find_clicked_actor(self, pos):
         for actor in self.level.actor_iterator():
@@ -79,8 +95,13 @@ class PlayerInfoPanel(Panel):
         self.add_child(self._gold_icon)
         self.add_child(self._gold_text)
 
-    def update(self, dt):
-        self._gold_text.text = str(self._logic_manager.game_state.player_gold)
+        game_state = self._logic_manager.game_state
+        game_state.add_listener(GameStateEvent.GOLD_CHANGED,
+                                self._on_gold_changed)
+        self._on_gold_changed(game_state)
+
+    def _on_gold_changed(self, game_state):
+        self._gold_text.text = str(game_state.player_gold)
 
 
 class PlayerHealthPanel(Panel):
@@ -93,12 +114,20 @@ class PlayerHealthPanel(Panel):
         self._health_progress = ProgressBarDrawer(
             ResourceManager.load_image(ResourceClass.UI, "base-health-bar.png"))
         self._base = base
+        self._percentage = None
+
+    def _get_percentage(self):
+        return min(max(self._base.get_hp_percentage(), 0.), 1.)
+
+    def update(self, dt):
+        if self._get_percentage() != self._percentage:
+            self.mark_dirty()
 
     def draw(self, surface):
         super().draw(surface)
-        percentage = self._base.get_hp_percentage()
+        self._percentage = self._get_percentage()
         pos = self.position + Vector2(16, 9)
-        self._health_progress.draw(surface, pos, percentage)
+        self._health_progress.draw(surface, pos, self._percentage)
 
 
 class GameActionButton(Button):
@@ -116,6 +145,10 @@ class GameActionButton(Button):
                                                     **self._action_args)
         self.click_callback = self.start_action
 
+        action_manager.logic_manager.game_state.add_listener(
+            GameStateEvent.GOLD_CHANGED, self._on_gold_changed)
+        self.refresh()
+
     def start_action(self, event):
         """
         Starts action
@@ -125,9 +158,16 @@ class GameActionButton(Button):
         if event.type == pygame.MOUSEBUTTONUP:
             self._action_manager.start_action(self._action, mouse_pos=event.pos)
 
-    def update(self, dt):
+    def refresh(self):
+        """
+        Enables button when action is allowed
+        :return:
+        """
         self.disabled = not self._action_manager.is_action_allowed(self._action)
 
+    def _on_gold_changed(self, game_state):
+        self.refresh()
+
 
 class GuardianPanel(Panel):
     """
@@ -160,8 +200,15 @@ class GuardianPanel(Panel):
         self._guardian_level.position_attach_type = PositionAttachType.CENTER
         self._guardian_level.position = Vector2(142, 77)
 
+        self._targeting_button = Button("", color=(255, 255, 255), size=20)
+        self._targeting_button.position_attach_type = PositionAttachType.CENTER
+        self._targeting_button.position = Vector2(142, 122)
+        self._targeting_button.z = 2
+        self._targeting_button.click_callback = self._change_targeting
+
         self.add_child(self._guardian_name)
         self.add_child(self._guardian_level)
+        self.add_child(self._targeting_button)
         self.add_child(self._upgrade_button)
         self.add_child(self._coins)
         self.add_child(self._coins_icon)
@@ -197,10 +244,30 @@ class GuardianPanel(Panel):
             else:
                 self._coins_icon.visible = True
                 self._coins.text = str(self._actor.get_current_evolution_cost())
+            self._refresh_targeting()
         else:
             self.visible = False
         self._upgrade_button.actor = self._actor
 
+    def _targeting_ai(self):
+        ai = self._actor.ai if self._actor is not None else None
+        if isinstance(ai, StandardAI) and not isinstance(ai, AttackOnlyBase):
+            return ai
+        return None
+
+    def _refresh_targeting(self):
+        ai = self._targeting_ai()
+        self._targeting_button.visible = ai is not None
+        if ai is not None:
+            self._targeting_button.text = "Target: {0}".format(
+                ai.targeting.name.capitalize())
+
+    def _change_targeting(self, event):
+        ai = self._targeting_ai()
+        if event.type == pygame.MOUSEBUTTONUP and ai is not None:
+            ai.targeting = ai.targeting.next()
+            self._refresh_targeting()
+
 
 class UpgradeButton(Button):
     """
@@ -215,6 +282,8 @@ class UpgradeButton(Button):
         self._logic_manager = logic_manager
         self.z = 2
         self._click_callback = self.clicked
+        logic_manager.game_state.add_listener(GameStateEvent.GOLD_CHANGED,
+                                              self._on_gold_changed)
 
     @property
     def actor(self):
@@ -227,14 +296,22 @@ class UpgradeButton(Button):
     @actor.setter
     def actor(self, value):
         self._actor = value
+        self.refresh()
 
     def on_mouse_click_event(self, event):
         super().on_mouse_click_event(event)
 
-    def update(self, dt):
+    def refresh(self):
+        """
+        Enables button when actor can be evolved
+        :return:
+        """
         if self._actor is not None:
             self.disabled = not self._logic_manager.can_evolve(self.actor)
 
+    def _on_gold_changed(self, game_state):
+        self.refresh()
+
     def clicked(self, event):
         """
         Handler
@@ -245,3 +322,72 @@ class UpgradeButton(Button):
             if self._actor is not None and \
                     self._logic_manager.can_evolve(self.actor):
                 self._logic_manager.evolve(self._actor)
+
+
+class PerformanceHud(Panel):
+    """
+    Overlay with performance counters. Does nothing while hidden, when shown
+    refreshes a few times per second and re-renders only changed lines
+    """
+    LINES = 6
+    LINE_HEIGHT = 18
+    WIDTH = 230
+    REFRESH_INTERVAL = 0.25
+
+    def __init__(self, level, scheduler, gc_monitor=None):
+        super().__init__(img=self._create_background())
+        self.z = 100
+        self._level = level
+        self._scheduler = scheduler
+        self._gc_monitor = gc_monitor
+        self._frame_times = deque(maxlen=120)
+        self._to_refresh = 0.
+        self._lines = []
+        for index in range(self.LINES):
+            line = Text("", size=16)
+            line.z = self.z
+            line.position = Vector2(6, 2 + index * self.LINE_HEIGHT)
+            self._lines.append(line)
+            self.add_child(line)
+        self.visible = False
+
+    def _create_background(self):
+        background = pygame.Surface(
+            (self.WIDTH, self.LINES * self.LINE_HEIGHT + 6), pygame.SRCALPHA)
+        background.fill((0, 0, 0, 160))
+        return background
+
+    def update(self, dt):
+        if not self.visible:
+            return
+
+        self._frame_times.append(dt)
+        self._to_refresh -= dt
+        if self._to_refresh <= 0:
+            self._to_refresh = self.REFRESH_INTERVAL
+            for line, text in zip(self._lines, self._get_lines()):
+                if line.text != text:
+                    line.text = text
+
+    def _get_lines(self):
+        frame_times = sorted(self._frame_times)
+        average = sum(frame_times) / len(frame_times)
+        tick_time = sum(system.last_duration
+                        for system in self._scheduler.systems)
+        counts = self._level.entity_counts()
+        gc_line = ""
+        if self._gc_monitor is not None:
+            gc_line = "GC: {0}/{1}/{2} max {3:.2f} ms".format(
+                *self._gc_monitor.collections,
+                self._gc_monitor.max_recent_pause * 1000.)
+        return [
+            "FPS: {0:.1f}".format(1. / average if average > 0 else 0.),
+            "Sim tick: {0:.2f} ms".format(tick_time * 1000.),
+            "Frame p50/p99: {0:.1f}/{1:.1f} ms".format(
+                percentile(frame_times, 50) * 1000.,
+                percentile(frame_times, 99) * 1000.),
+            "Actors: {actors} Bullets: {bullets} Effects: {effects}".format(
+                **counts),
+            gc_line,
+            "Text cache: {0:.0f}% hits".format(TextCache.hit_rate() * 100.),
+        ]
@@ -0,0 +1,42 @@
+import argparse
+import os
+import tempfile
+import unittest
+
+from benchmark import Results
+
+
+class ResultsTests(unittest.TestCase):
+    def test_compare_shouldFlagRegressionsByDirection(self):
+        baseline = {'towers': {'ticks_per_second': 100.,
+                               'systems_ms': {'movement': 1.}}}
+        current = {'towers': {'ticks_per_second': 80.,
+                              'systems_ms': {'movement': 0.5}}}
+
+        comparison = Results.compare(baseline, current,
+                                     higher_is_better={'ticks_per_second'})
+
+        flagged = {metric: is_regression
+                   for metric, _, _, _, is_regression in comparison}
+        self.assertEqual(flagged, {'towers.systems_ms.movement': False,
+                                   'towers.ticks_per_second': True})
+
+    def test_finish_differentParameters_shouldRejectComparison(self):
+        results = {'towers': {'ticks_per_second': 100.}}
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            Results.save(baseline, 'simulation', results, {'monsters': 200})
+            arguments = argparse.Namespace(output=None, compare=baseline,
+                                           tolerance=0.1)
+
+            same = Results.finish(arguments, 'simulation', results,
+                                  parameters={'monsters': 200})
+            different = Results.finish(arguments, 'simulation', results,
+                                       parameters={'monsters': 1000})
+
+        self.assertEqual(same, 0)
+        self.assertEqual(different, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
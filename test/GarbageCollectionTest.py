@@ -0,0 +1,61 @@
+import gc
+import unittest
+
+from pytowerdefence.GarbageCollection import GcMonitor, GcPolicy
+from pytowerdefence.Profiler import FrameProfiler
+
+
+class GcMonitorTests(unittest.TestCase):
+    def test_flush_shouldRecordPausesPerGeneration(self):
+        monitor = GcMonitor()
+        profiler = FrameProfiler()
+        monitor.install()
+        try:
+            gc.collect(2)
+        finally:
+            monitor.uninstall()
+
+        profiler.begin_frame()
+        monitor.flush(profiler)
+        profiler.end_frame()
+
+        frame = profiler.last_frame
+        self.assertEqual(monitor.collections[2], 1)
+        self.assertGreater(frame['gc.gen2'], 0.)
+        self.assertEqual(frame['gc.gen0'], 0.)
+
+
+class GcPolicyTests(unittest.TestCase):
+    def setUp(self):
+        self.thresholds = gc.get_threshold()
+
+    def tearDown(self):
+        gc.set_threshold(*self.thresholds)
+
+    def test_enable_shouldDeferFullCollections(self):
+        policy = GcPolicy()
+        policy.enable()
+        self.assertGreater(gc.get_threshold()[2], self.thresholds[2])
+
+        policy.disable()
+        self.assertEqual(gc.get_threshold(), self.thresholds)
+
+    def test_onFrameEnd_shouldCollectOnlyInSpareTime(self):
+        policy = GcPolicy(frame_budget=0.01)
+        policy.enable()
+        try:
+            for _ in range(self.thresholds[2]):
+                gc.collect(1)
+            self.assertTrue(policy.collection_due)
+
+            policy.on_frame_end(frame_time=0.02)
+            self.assertEqual(policy.collections, 0)
+            policy.on_frame_end(frame_time=0.)
+            self.assertEqual(policy.collections, 1)
+            self.assertFalse(policy.collection_due)
+        finally:
+            policy.disable()
+
+
+if __name__ == '__main__':
+    unittest.main()
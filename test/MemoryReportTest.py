@@ -0,0 +1,20 @@
+import sys
+import unittest
+
+from benchmark.MemoryReport import deep_size
+
+
+class DeepSizeTests(unittest.TestCase):
+    def test_deepSize_shouldCountSharedObjectsOnce(self):
+        shared = [0.5] * 100
+        first, second = [shared, 'first'], [shared, 'second']
+        seen = set()
+
+        deep_size([first], seen)
+        size = deep_size([second], seen)
+
+        self.assertEqual(size, sys.getsizeof(second) + sys.getsizeof('second'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from pytowerdefence.Profiler import AllocationTracker, FrameProfiler, \
+    HitchDetector, SamplingProfiler, percentile
+
+
+class FrameProfilerTests(unittest.TestCase):
+    def test_percentile_shouldUseNearestRank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.)
+
+    def test_ringBuffer_shouldKeepLastFrames(self):
+        profiler = FrameProfiler(capacity=3)
+        for index in range(5):
+            profiler.begin_frame()
+            profiler.set_count('actors', index)
+            profiler.end_frame()
+
+        self.assertEqual([f['actors'] for f in profiler.frames], [2, 3, 4])
+        self.assertEqual(profiler.summary()['actors']['max'], 4)
+
+
+class HitchDetectorTests(unittest.TestCase):
+    def test_check_shouldLogSlowFrameWithPreviousFrames(self):
+        profiler = FrameProfiler()
+        with tempfile.TemporaryDirectory() as directory:
+            detector = HitchDetector(os.path.join(directory, 'hitches.log'),
+                                     budget=0.01, history=2)
+            results = []
+            for index, total in enumerate([0.001, 0.002, 0.003, 0.05]):
+                profiler.begin_frame()
+                profiler.set_count('spawns', index)
+                profiler.set_count('effects', 0)
+                profiler.end_frame()
+                profiler.last_frame['total'] = total
+                results.append(detector.check(profiler))
+
+            with open(detector.path) as data:
+                lines = data.read().splitlines()
+
+        self.assertEqual(results, [False, False, False, True])
+        self.assertEqual(len(lines), 1)
+        entry = detector.entries[0]
+        self.assertEqual(entry['frame'], {'frame': 3, 'spawns': 3,
+                                          'effects': 0, 'total': 50.})
+        self.assertEqual([f['frame'] for f in entry['previous']], [1, 2])
+
+
+class SamplingProfilerTests(unittest.TestCase):
+    def test_sample_shouldWriteCollapsedStacksPerLabel(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = SamplingProfiler(directory)
+            profiler.label_provider = lambda: 'game.wave-1'
+            profiler.sample()
+            profiler.sample()
+
+            capture = profiler.write()
+            with open(os.path.join(capture, 'game.wave-1.folded')) as data:
+                lines = data.read().splitlines()
+
+        self.assertEqual(len(lines), 1)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertEqual(count, '2')
+        frames = stack.split(';')
+        self.assertTrue(frames[-1].startswith('sample '))
+        self.assertTrue(frames[-2].startswith(
+            'test_sample_shouldWriteCollapsedStacksPerLabel '))
+
+
+class AllocationTrackerTests(unittest.TestCase):
+    def test_endTick_shouldAttributeRetainedBlocksToFunction(self):
+        retained = []
+
+        def allocate():
+            retained.append([object() for _ in range(10)])
+
+        tracker = AllocationTracker()
+        tracker.start()
+        try:
+            for _ in range(2):
+                tracker.begin_tick()
+                allocate()
+                tracker.end_tick()
+        finally:
+            tracker.stop()
+
+        self.assertEqual(tracker.ticks, 2)
+        functions = [function for _, function, _, _, _ in tracker.report()]
+        self.assertIn(
+            'AllocationTrackerTests.test_endTick_shouldAttributeRetainedBlocks'
+            'ToFunction.allocate', functions)
+
+
+if __name__ == '__main__':
+    unittest.main()
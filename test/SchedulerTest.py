@@ -0,0 +1,38 @@
+import unittest
+
+import mock
+
+from pytowerdefence.Scheduler import SystemScheduler
+
+
+class SystemSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SystemScheduler()
+        self.every_tick = mock.Mock()
+        self.slow = mock.Mock()
+        self.scheduler.add('every_tick', self.every_tick)
+        self.scheduler.add('slow', self.slow, rate=10)
+
+    def test_update_shouldRunSystemsAtTheirRates(self):
+        for _ in range(6):
+            self.scheduler.update(0.04)
+
+        self.assertEqual(self.every_tick.call_count, 6)
+        self.assertEqual(self.slow.call_count, 2)
+        self.assertAlmostEqual(self.slow.call_args_list[0][0][0], 0.12)
+
+    def test_disabledSystem_shouldNotRun(self):
+        self.scheduler.set_enabled('every_tick', False)
+        self.scheduler.update(0.1)
+
+        self.every_tick.assert_not_called()
+        self.slow.assert_called_once_with(0.1)
+
+    def test_stats_shouldCountRuns(self):
+        self.scheduler.update(0.1)
+
+        self.assertEqual(self.scheduler.stats()['slow']['runs'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
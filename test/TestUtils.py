@@ -1,2 +1,32 @@
+from pygame.math import Vector2
+
+from pytowerdefence.gameplay.Controllers import PathController
+from pytowerdefence.gameplay.Objects import Actor
+
+
 def path_to_test_data(file):
     return "../../test_data/" + file
+
+
+def create_actor(position, hp=10, attack_range=10, path=None, distance=0.):
+    """
+    Creates configured actor without resources
+    :param position:
+    :param hp:
+    :param attack_range:
+    :param path: when given, actor follows path with path controller
+    :param distance: distance traveled along path
+    :return:
+    """
+    actor = Actor({'name': 'test'})
+    actor.position = Vector2(position)
+    actor.base_statistics.attack_range = attack_range
+    actor.base_statistics.hit_effects = []
+    actor.recalculate_statistics()
+    actor.hp = hp
+    if path is not None:
+        path_controller = PathController()
+        actor.add_controller(path_controller)
+        path_controller.set_path(path)
+        path_controller.distance = distance
+    return actor
@@ -0,0 +1,250 @@
+import unittest
+from collections import OrderedDict
+
+import mock
+import pygame
+from pygame.math import Vector2
+
+from pytowerdefence.Resource import ResourceManager, ResourceClass
+from pytowerdefence.UI import Panel, Text, TextCache, UIManager, Widget, \
+    coalesce_mouse_motion
+
+
+class FakeFont:
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, text, antialias, color):
+        self.renders += 1
+        return pygame.Surface((len(text) * 8, 16))
+
+
+class UIManagerDrawTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = UIManager((64, 64))
+        self.screen = pygame.Surface((64, 64))
+        self.panel = Panel(img=pygame.Surface((8, 8)))
+        self.panel.draw = mock.Mock(wraps=self.panel.draw)
+        self.manager.add_widget(self.panel)
+
+    def test_draw_shouldRedrawLayerOnlyWhenDirty(self):
+        self.manager.draw(self.screen)
+        self.manager.draw(self.screen)
+        self.assertEqual(self.panel.draw.call_count, 1)
+
+        self.panel.position = Vector2(10, 10)
+        self.manager.draw(self.screen)
+        self.assertEqual(self.panel.draw.call_count, 2)
+
+    def test_draw_hiddenWidget_shouldNotBeComposed(self):
+        self.panel.visible = False
+        self.manager.draw(self.screen)
+
+        self.assertEqual(self.panel.draw.call_count, 0)
+
+
+def translucent(size, color):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
+
+
+class DirectWidget(Panel):
+    retained = False
+
+
+class UIManagerCompositionTests(unittest.TestCase):
+    SIZE = (48, 48)
+
+    def setUp(self):
+        self.manager = UIManager(self.SIZE)
+        self.widgets = []
+
+    def add(self, widget, position):
+        widget.position = Vector2(position)
+        self.manager.add_widget(widget)
+        self.widgets.append(widget)
+        return widget
+
+    def assert_same_as_direct_drawing(self):
+        composed = pygame.Surface(self.SIZE)
+        composed.fill((200, 200, 255))
+        direct = composed.copy()
+        self.manager.draw(composed)
+        for widget in self.widgets:
+            widget.draw(direct)
+
+        for x in range(self.SIZE[0]):
+            for y in range(self.SIZE[1]):
+                for expected, actual in zip(direct.get_at((x, y)),
+                                            composed.get_at((x, y))):
+                    self.assertLessEqual(abs(expected - actual), 2,
+                                         "pixel {0}".format((x, y)))
+
+    def test_translucentWidgets_shouldMatchDirectDrawing(self):
+        background = self.add(Panel(img=translucent((32, 32),
+                                                    (0, 0, 0, 160))), (0, 0))
+        child = Panel(img=translucent((16, 16), (255, 255, 255, 128)))
+        background.add_child(child)
+        self.add(child, (8, 8))
+        opaque = pygame.Surface((8, 8))
+        opaque.fill((255, 0, 0))
+        self.add(Panel(img=opaque), (28, 28))
+        self.add(Panel(img=translucent((16, 16), (0, 255, 0, 100))), (20, 20))
+
+        self.assert_same_as_direct_drawing()
+
+    def test_notRetainedWidget_shouldKeepOrderInLayer(self):
+        self.add(Panel(img=translucent((24, 24), (0, 0, 255, 200))), (0, 0))
+        solid = pygame.Surface((24, 24))
+        solid.fill((255, 0, 0))
+        self.add(DirectWidget(img=solid), (12, 12))
+        self.add(Panel(img=translucent((24, 24), (0, 255, 0, 120))), (20, 20))
+
+        self.assert_same_as_direct_drawing()
+
+
+class UIManagerLookupTests(unittest.TestCase):
+    def setUp(self):
+        self.manager = UIManager((256, 256))
+
+    def create_widget(self, z, rect, widget_id=None):
+        widget = Widget(widget_id)
+        widget.z = z
+        widget.rect.size = rect[2:]
+        widget.position = Vector2(rect[:2])
+        self.manager.add_widget(widget)
+        return widget
+
+    def test_getById_shouldForgetRemovedWidget(self):
+        widget = self.create_widget(1, (0, 0, 10, 10), 'panel')
+        self.assertIs(self.manager.get_by_id('panel'), widget)
+
+        self.manager.remove_widget(widget)
+        self.assertIsNone(self.manager.get_by_id('panel'))
+
+    def test_collidingWidget_shouldReturnTopVisibleWidget(self):
+        bottom = self.create_widget(0, (0, 0, 256, 256))
+        top = self.create_widget(5, (100, 100, 20, 20))
+
+        self.assertIs(self.manager._get_colliding_widget((110, 110)), top)
+        self.assertIs(self.manager._get_colliding_widget((10, 10)), bottom)
+
+        top.visible = False
+        self.assertIs(self.manager._get_colliding_widget((110, 110)), bottom)
+        top.visible = True
+        top.position = Vector2(0, 0)
+        self.assertIs(self.manager._get_colliding_widget((10, 10)), top)
+
+    def test_redrawRequest_shouldNotReindexWidgets(self):
+        widget = self.create_widget(1, (0, 0, 100, 100))
+        grid = self.manager._hit_test_grid
+        with mock.patch.object(grid, 'move', wraps=grid.move) as move:
+            widget.mark_dirty()
+            widget.visible = False
+            widget.visible = True
+            self.manager._get_colliding_widget((10, 10))
+
+            self.assertEqual(move.call_count, 0)
+
+    def test_movedWidget_shouldBeReindexed(self):
+        bottom = self.create_widget(0, (0, 0, 256, 256))
+        panel = Panel(img=pygame.Surface((10, 10)))
+        panel.z = 1
+        self.manager.add_widget(panel)
+
+        panel.position = Vector2(200, 200)
+        self.assertIs(self.manager._get_colliding_widget((5, 5)), bottom)
+        self.assertIs(self.manager._get_colliding_widget((205, 205)), panel)
+
+        panel.set_image(pygame.Surface((50, 50)))
+        self.assertIs(self.manager._get_colliding_widget((240, 240)), panel)
+
+        self.manager.remove_widget(panel)
+        self.assertIs(self.manager._get_colliding_widget((205, 205)), bottom)
+
+
+class TextCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.font = FakeFont()
+        patches = [
+            mock.patch.object(TextCache, '_surfaces', OrderedDict()),
+            mock.patch.object(TextCache, 'MAX_SIZE', 2),
+            mock.patch.object(ResourceManager, 'load_font',
+                              return_value=self.font),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_render_sameKey_shouldReturnSameSurface(self):
+        surface = TextCache.render("10", 24, (0, 0, 0))
+
+        self.assertIs(TextCache.render("10", 24, (0, 0, 0)), surface)
+        self.assertIsNot(TextCache.render("10", 20, (0, 0, 0)), surface)
+        self.assertIsNot(TextCache.render("10", 24, (1, 0, 0)), surface)
+        self.assertEqual(self.font.renders, 3)
+
+    def test_render_shouldEvictLeastRecentlyUsed(self):
+        first = TextCache.render("1", 24, (0, 0, 0))
+        TextCache.render("2", 24, (0, 0, 0))
+        TextCache.render("1", 24, (0, 0, 0))
+        TextCache.render("3", 24, (0, 0, 0))
+
+        self.assertEqual(list(TextCache._surfaces),
+                         [("1", 24, (0, 0, 0)), ("3", 24, (0, 0, 0))])
+        self.assertIs(TextCache.render("1", 24, (0, 0, 0)), first)
+        self.assertEqual(self.font.renders, 3)
+
+    def test_setSameText_shouldNotRenderNorMarkDirty(self):
+        text = Text("10")
+        text.mark_dirty = mock.Mock()
+        with mock.patch.object(TextCache, 'render',
+                               wraps=TextCache.render) as render:
+            text.text = "10"
+            self.assertEqual(render.call_count, 0)
+            self.assertEqual(text.mark_dirty.call_count, 0)
+
+            text.text = "11"
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(text.mark_dirty.call_count, 1)
+
+
+class LoadFontTests(unittest.TestCase):
+    @mock.patch.object(ResourceManager, '_fonts', {})
+    @mock.patch('pygame.font.Font')
+    def test_loadFont_shouldParseEveryPathAndSizeOnce(self, font):
+        loads = ResourceManager.loads
+        first = ResourceManager.load_font(ResourceClass.UI, 'font.ttf', 24)
+
+        self.assertIs(ResourceManager.load_font(ResourceClass.UI, 'font.ttf',
+                                                24), first)
+        ResourceManager.load_font(ResourceClass.UI, 'font.ttf', 20)
+        ResourceManager.load_font(ResourceClass.UI, 'other.ttf', 24)
+
+        self.assertEqual(ResourceManager.loads - loads, 3)
+        self.assertEqual(font.call_count, 3)
+
+
+class CoalesceMouseMotionTests(unittest.TestCase):
+    @staticmethod
+    def motion(pos, rel):
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel,
+                                  buttons=(0, 0, 0))
+
+    def test_coalesce_shouldMergeOnlyConsecutiveMotions(self):
+        click = pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(3, 0), button=1)
+        events = [self.motion((1, 0), (1, 0)), self.motion((3, 0), (2, 0)),
+                  click, self.motion((4, 1), (1, 1))]
+
+        coalesced = coalesce_mouse_motion(events)
+
+        self.assertEqual(len(coalesced), 3)
+        self.assertEqual(coalesced[0].pos, (3, 0))
+        self.assertEqual(coalesced[0].rel, (3, 0))
+        self.assertIs(coalesced[1], click)
+        self.assertIs(coalesced[2], events[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from pytowerdefence.gameplay.AI import StandardAI, TargetingPolicy, BaseAI
+from pytowerdefence.gameplay.Controllers import AttackController
+from pytowerdefence.gameplay.Objects import PLAYER_TEAM
+from test.TestUtils import create_actor
+
+PATH = [(0, 0), (100, 0)]
+
+
+class StandardAITests(unittest.TestCase):
+    def setUp(self):
+        self.tower = create_actor((0, 0), attack_range=100)
+        self.tower.team = PLAYER_TEAM
+        self.controller = AttackController()
+        self.tower.add_controller(self.controller)
+        self.ai = StandardAI()
+        self.tower.set_ai(self.ai)
+        self.near = create_actor((10, 0), hp=50, path=PATH, distance=20)
+        self.far = create_actor((50, 0), hp=5, path=PATH, distance=70)
+        self.tower.actors_in_attack_range = {self.near, self.far}
+
+    def select(self, policy):
+        self.ai.targeting = policy
+        self.controller.target = None
+        self.ai.invalidate()
+        self.ai.update(0.)
+        return self.controller.target
+
+    def test_policies_shouldChooseMatchingTarget(self):
+        self.assertIs(self.select(TargetingPolicy.FIRST), self.far)
+        self.assertIs(self.select(TargetingPolicy.LAST), self.near)
+        self.assertIs(self.select(TargetingPolicy.STRONGEST), self.near)
+        self.assertIs(self.select(TargetingPolicy.WEAKEST), self.far)
+        self.assertIs(self.select(TargetingPolicy.CLOSEST), self.near)
+
+    def test_validTarget_shouldBeKept(self):
+        self.select(TargetingPolicy.WEAKEST)
+        self.ai.targeting = TargetingPolicy.STRONGEST
+        self.ai.on_range_changed({create_actor((20, 0), path=PATH)}, {self.near})
+        self.ai.update(0.)
+
+        self.assertIs(self.controller.target, self.far)
+
+    def test_targetOutOfRange_shouldRetarget(self):
+        self.select(TargetingPolicy.WEAKEST)
+        self.tower.actors_in_attack_range = {self.near}
+        self.ai.on_range_changed(set(), {self.far})
+        self.ai.update(0.)
+
+        self.assertIs(self.controller.target, self.near)
+
+    def test_nothingChanged_shouldNotEvaluate(self):
+        self.select(TargetingPolicy.FIRST)
+        evaluations = BaseAI.evaluations
+        self.ai.update(0.)
+        self.ai.update(0.)
+
+        self.assertEqual(BaseAI.evaluations, evaluations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import gc
+import unittest
+import weakref
+
+from pygame import Rect
+from pygame.math import Vector2
+
+from pytowerdefence.gameplay.Controllers import AttackController, \
+    FlowFieldController
+from pytowerdefence.gameplay.Navigation import FlowField
+from pytowerdefence.gameplay.Objects import ActorState
+from test.TestUtils import create_actor
+
+
+class AttackControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.attacker = create_actor((0, 0))
+        self.controller = AttackController()
+        self.attacker.add_controller(self.controller)
+
+    def test_setTargetInRange_shouldStartAttack(self):
+        target = create_actor((5, 0))
+        self.attacker.actors_in_attack_range = {target}
+        self.controller.target = target
+
+        self.assertEqual(self.attacker.state, ActorState.ATTACK)
+        self.assertIs(self.controller.target, target)
+
+    def test_targetDeath_shouldDropTargetAndStopAttack(self):
+        target = create_actor((5, 0))
+        self.attacker.actors_in_attack_range = {target}
+        self.controller.target = target
+
+        target.hit(20)
+
+        self.assertIsNone(self.controller.target)
+        self.assertEqual(self.attacker.state, ActorState.IDLE)
+
+    def test_killedTarget_shouldBeReleased(self):
+        target = create_actor((5, 0))
+        self.controller.target = target
+        target_reference = weakref.ref(target)
+
+        target.hit(20)
+        target.kill()
+        del target
+        gc.collect()
+
+        self.assertIsNone(target_reference())
+
+
+class FlowFieldControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.field = FlowField(10, 10, 32)
+        self.field.set_goal(Rect(9 * 32, 0, 32, 32))
+        self.actor = create_actor((16, 9 * 32 + 16))
+        self.actor.base_statistics.speed = 10
+        self.actor.recalculate_statistics()
+        self.controller = FlowFieldController(self.field)
+        self.actor.add_controller(self.controller)
+
+    def test_unreachableGoal_shouldWaitWithoutFinishing(self):
+        self.field.block(Rect(5 * 32, 0, 32, 10 * 32))
+
+        self.controller.update(0.)
+
+        self.assertEqual(self.actor.state, ActorState.IDLE)
+        self.assertFalse(self.controller.finished)
+        self.assertTrue(self.controller.need_update())
+
+    def test_obstaclePlacedOverActor_shouldLeaveIt(self):
+        self.controller.update(0.)
+        self.field.block(Rect(0, 9 * 32, 32, 32))
+
+        self.controller.update(0.)
+
+        self.assertEqual(self.actor.state, ActorState.MOVE)
+        self.assertGreater(self.actor.velocity.x, 0)
+
+    def test_goalReached_shouldFinish(self):
+        self.actor.position = Vector2(9 * 32 + 16, 16)
+
+        self.controller.update(0.)
+
+        self.assertTrue(self.controller.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import mock
+
+from pytowerdefence.gameplay.Logic import GameState, GameStateEvent, \
+    LogicManager
+
+
+class TestGameState(TestCase):
+    def test_setGold_shouldNotifyOnlyOnChange(self):
+        state = GameState()
+        listener = mock.Mock()
+        state.add_listener(GameStateEvent.GOLD_CHANGED, listener)
+
+        state.player_gold = 10
+        state.player_gold = 10
+
+        listener.assert_called_once_with(state)
+
+    def test_timeThreshold_shouldNotifyOnceWhenExceeded(self):
+        state = GameState()
+        listener = mock.Mock()
+        state.add_listener(GameStateEvent.TIME_THRESHOLD, listener)
+        state.add_time_threshold(1.)
+
+        state.time_elapsed = 1.
+        self.assertEqual(listener.call_count, 0)
+        state.time_elapsed = 1.5
+        state.time_elapsed = 2.
+        self.assertEqual(listener.call_count, 1)
+
+
+class TestLogicManager(TestCase):
+    def test_monsterKilled_shouldWinWhenLastMonsterKilled(self):
+        app = mock.Mock()
+        manager = LogicManager({'player_gold': 0}, app)
+        manager.wave_manager = mock.Mock(end_time=0., monsters_created=2)
+        manager.wave_manager.no_waves_left.return_value = True
+        monster = mock.Mock(class_properties={'gold_gain': 5})
+
+        manager.on_monster_killed(monster)
+        self.assertFalse(app.set_phase.called)
+        manager.on_monster_killed(monster)
+
+        app.set_phase.assert_called_once_with('game_end', won=True)
+        self.assertEqual(manager.game_state.player_gold, 10)
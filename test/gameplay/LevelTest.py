@@ -0,0 +1,52 @@
+import unittest
+
+import mock
+import pygame
+from pygame import Rect
+
+from pytowerdefence.gameplay.Controllers import FlowFieldController
+from pytowerdefence.gameplay.Navigation import FlowField
+from pytowerdefence.gameplay.Scene import Level
+from test.TestUtils import create_actor
+
+
+class CanPlaceObstacleTests(unittest.TestCase):
+    def setUp(self):
+        self.level = Level((320, 320), mock.Mock())
+        self.level.tmx_data = mock.Mock()
+        self.level.tmx_data.get_layer_by_name.return_value = []
+        self.level.flow_field = FlowField(10, 10, 32)
+        self.level.flow_field.set_goal(Rect(9 * 32, 0, 32, 32))
+        self.level.group = pygame.sprite.Group()
+        self.level.spawn_cells = [0]
+
+    def add_monster(self, position):
+        monster = create_actor(position)
+        monster.add_controller(FlowFieldController(self.level.flow_field))
+        self.level.group.add(monster)
+        return monster
+
+    def test_towerSealingMonsterOnMap_shouldBeRejected(self):
+        self.add_monster((2 * 32 + 16, 5 * 32 + 16))
+        self.level.flow_field.block(Rect(32, 4 * 32, 96, 32))
+        self.level.flow_field.block(Rect(32, 6 * 32, 96, 32))
+        self.level.flow_field.block(Rect(32, 5 * 32, 32, 32))
+
+        self.assertFalse(self.level.can_place_obstacle(
+            Rect(3 * 32, 5 * 32, 32, 32)))
+        self.assertTrue(self.level.can_place_obstacle(
+            Rect(5 * 32, 5 * 32, 32, 32)))
+
+    def test_finishedMonster_shouldNotBlockPlacement(self):
+        monster = self.add_monster((2 * 32 + 16, 5 * 32 + 16))
+        monster.get_controller(FlowFieldController).stop()
+        self.level.flow_field.block(Rect(32, 4 * 32, 96, 32))
+        self.level.flow_field.block(Rect(32, 6 * 32, 96, 32))
+        self.level.flow_field.block(Rect(32, 5 * 32, 32, 32))
+
+        self.assertTrue(self.level.can_place_obstacle(
+            Rect(3 * 32, 5 * 32, 32, 32)))
+
+
+if __name__ == '__main__':
+    unittest.main()
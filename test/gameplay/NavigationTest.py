@@ -0,0 +1,116 @@
+import random
+import unittest
+
+from pygame.math import Vector2
+from pygame.rect import Rect
+
+from pytowerdefence.gameplay.Navigation import ArcLengthPath, FlowField
+
+
+class ArcLengthPathTests(unittest.TestCase):
+    def setUp(self):
+        self.path = ArcLengthPath([(0, 0), (10, 0), (10, 20)])
+
+    def test_lengths_shouldBeCumulative(self):
+        self.assertEqual(self.path.lengths, [0, 10, 30])
+        self.assertEqual(self.path.length, 30)
+
+    def test_positionAt_shouldInterpolateOnSegment(self):
+        self.assertEqual(self.path.position_at(5), Vector2(5, 0))
+        self.assertEqual(self.path.position_at(15), Vector2(10, 5))
+
+    def test_positionAt_withOut_shouldWriteInPlace(self):
+        out = Vector2()
+
+        self.assertIs(self.path.position_at(15, out=out), out)
+        self.assertEqual(out, Vector2(10, 5))
+
+    def test_segmentAt_shouldSkipManySegmentsFromHint(self):
+        self.assertEqual(self.path.segment_at(25, hint=0), 1)
+        self.assertEqual(self.path.segment_at(5, hint=1), 0)
+
+    def test_intervalsWithin_shouldReturnCoveredDistances(self):
+        intervals = self.path.intervals_within(Vector2(10, 0), 5)
+
+        self.assertEqual(len(intervals), 1)
+        self.assertAlmostEqual(intervals[0][0], 5)
+        self.assertAlmostEqual(intervals[0][1], 15)
+
+    def test_intervalsWithin_farCircle_shouldBeEmpty(self):
+        self.assertEqual(self.path.intervals_within(Vector2(50, 50), 5), [])
+
+    def test_singlePointPath_shouldHaveZeroLength(self):
+        path = ArcLengthPath([(3, 4)])
+
+        self.assertEqual(path.length, 0)
+        self.assertEqual(path.position_at(10), Vector2(3, 4))
+
+
+class FlowFieldTests(unittest.TestCase):
+    def setUp(self):
+        self.field = FlowField(10, 10, 32)
+        self.field.set_goal(Rect(9 * 32, 0, 32, 32))
+
+    def test_compute_shouldPointTowardGoal(self):
+        self.assertEqual(self.field.distances[9], 0)
+        self.assertEqual(self.field.direction_of(self.field.cell_at((16, 16))),
+                         Vector2(1, 0))
+        self.assertIsNone(self.field.direction_of(9))
+
+    def test_block_shouldRouteAroundObstacle(self):
+        self.field.block(Rect(5 * 32, 0, 32, 9 * 32))
+
+        self.assertIsNone(self.field.direction_of(5))
+        self.assertEqual(self.field.next_cells[self.field.cell_at((4 * 32, 0))]
+                         % 10, 4)
+
+    def test_incrementalBlock_shouldMatchFullCompute(self):
+        generator = random.Random(7)
+        for _ in range(30):
+            self.field.block_cells([generator.randrange(100)])
+            incremental = [round(d, 6) for d in self.field.distances]
+            self.field.compute()
+            self.assertEqual(incremental,
+                             [round(d, 6) for d in self.field.distances])
+
+    def test_blockedGoal_shouldBeUnreachable(self):
+        self.field.block(Rect(8 * 32, 0, 32, 64))
+        self.field.block(Rect(9 * 32, 32, 32, 32))
+
+        self.assertEqual(self.field.distances[0], float('inf'))
+        self.assertIsNone(self.field.direction_of(0))
+
+    def test_wallDisconnectingSpawn_shouldNotKeepReachable(self):
+        spawn = self.field.cell_at((16, 9 * 32 + 16))
+        self.field.block(Rect(5 * 32, 32, 32, 9 * 32))
+        distances = list(self.field.distances)
+
+        self.assertFalse(self.field.keeps_reachable(Rect(5 * 32, 0, 32, 32),
+                                                    [spawn]))
+        self.assertTrue(self.field.keeps_reachable(Rect(3 * 32, 0, 32, 32),
+                                                   [spawn]))
+        self.assertEqual(self.field.distances, distances)
+        self.assertFalse(self.field.is_blocked(5))
+
+    def test_wallAroundCell_shouldNotKeepReachable(self):
+        monster = self.field.cell_at((2 * 32 + 16, 5 * 32 + 16))
+        self.field.block(Rect(32, 4 * 32, 96, 32))
+        self.field.block(Rect(32, 6 * 32, 96, 32))
+        self.field.block(Rect(32, 5 * 32, 32, 32))
+
+        self.assertFalse(self.field.keeps_reachable(
+            Rect(3 * 32, 5 * 32, 32, 32), [monster]))
+        self.assertTrue(self.field.keeps_reachable(
+            Rect(3 * 32, 5 * 32, 32, 32), [0]))
+
+    def test_blockOverCell_shouldKeepReachableThroughNeighbour(self):
+        cell = self.field.cell_at((16, 16))
+
+        self.assertTrue(self.field.keeps_reachable(Rect(0, 0, 32, 32),
+                                                   [cell]))
+        self.field.block(Rect(0, 0, 32, 32))
+        self.assertEqual(self.field.escape_direction(cell), Vector2(1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from pytowerdefence.gameplay.AI import BaseAI, Interest
+from pytowerdefence.gameplay.Controllers import PathController
+from pytowerdefence.gameplay.Objects import ENEMY_TEAM, PLAYER_TEAM
+from pytowerdefence.gameplay.Scene import VisibilitySystem, is_visible
+from test.TestUtils import create_actor
+
+PATH = [(0, 0), (500, 0), (500, 300)]
+
+
+class RecordingAI(BaseAI):
+    interest = Interest.ENEMIES
+
+    def __init__(self):
+        super().__init__()
+        self.changes = []
+
+    def on_range_changed(self, entered, exited):
+        super().on_range_changed(entered, exited)
+        self.changes.append((entered, exited))
+
+
+class VisibilitySystemTests(unittest.TestCase):
+    def setUp(self):
+        self.system = VisibilitySystem()
+        self.towers = [self.create_tower((200, 50), 60),
+                       self.create_tower((450, 60), 100)]
+        self.follower = create_actor((0, 0), path=PATH)
+        self.follower.team = ENEMY_TEAM
+        self.path = self.follower.get_controller(PathController).path
+
+    def create_tower(self, position, attack_range):
+        tower = create_actor(position, attack_range=attack_range)
+        tower.team = PLAYER_TEAM
+        tower.set_ai(RecordingAI())
+        self.system.coverage.add(tower)
+        return tower
+
+    def move_follower(self, distance):
+        self.follower.get_controller(PathController).distance = distance
+        self.follower.position = self.path.position_at(distance)
+
+    def assert_coverage_matches_is_visible(self):
+        self.system.coverage.refresh()
+        for distance in range(0, int(self.path.length), 3):
+            self.move_follower(distance)
+            expected = {tower for tower in self.towers
+                        if tower.alive and is_visible(tower, self.follower)}
+            self.assertEqual(set(self.system.coverage.towers_at(
+                self.path, self.follower.radius, distance)), expected,
+                "distance {0}".format(distance))
+
+    def test_towersAt_shouldMatchIsVisible(self):
+        self.assert_coverage_matches_is_visible()
+
+    def test_rangeChange_shouldRecomputeIntervals(self):
+        self.assert_coverage_matches_is_visible()
+        self.towers[0].base_statistics.attack_range = 150
+        self.towers[0].recalculate_statistics()
+
+        self.assert_coverage_matches_is_visible()
+
+    def test_killedTower_shouldBeRemoved(self):
+        self.move_follower(200)
+        self.system.coverage.refresh()
+        self.assertIn(self.towers[0], self.system.coverage.towers_at(
+            self.path, self.follower.radius, 200))
+
+        self.towers[0].kill()
+
+        self.assert_coverage_matches_is_visible()
+        self.assertNotIn(self.towers[0], self.system.coverage)
+
+    def test_update_shouldNotifyAiAboutEnteredAndExited(self):
+        tower = self.towers[0]
+        self.move_follower(0)
+        self.system.update(self.towers + [self.follower])
+        self.move_follower(200)
+        self.system.update(self.towers + [self.follower])
+        self.move_follower(400)
+        self.system.update(self.towers + [self.follower])
+
+        self.assertEqual(tower.ai.changes, [({self.follower}, set()),
+                                            (set(), {self.follower})])
+        self.assertEqual(tower.actors_in_attack_range, set())
+        self.assertEqual(self.towers[1].actors_in_attack_range,
+                         {self.follower})
+
+
+class InterestTests(unittest.TestCase):
+    def setUp(self):
+        self.system = VisibilitySystem()
+        self.base = create_actor((100, 0))
+        self.base.team = PLAYER_TEAM
+        self.tower = create_actor((0, 50))
+        self.tower.team = PLAYER_TEAM
+
+    def test_baseInterest_shouldSeeOnlyBase(self):
+        attacker = create_actor((0, 45))
+        attacker.team = ENEMY_TEAM
+        ai = RecordingAI()
+        ai.interest = Interest.BASE
+        attacker.set_ai(ai)
+        actors = [self.base, self.tower, attacker]
+
+        self.system.update(actors, self.base)
+        self.assertEqual(attacker.actors_in_attack_range, set())
+        attacker.position = (95, 0)
+        self.system.update(actors, self.base)
+        attacker.position = (300, 0)
+        self.system.update(actors, self.base)
+
+        self.assertEqual(ai.changes, [({self.base}, set()),
+                                      (set(), {self.base})])
+
+    def test_actorWithoutAi_shouldSeeEveryone(self):
+        observer = create_actor((0, 10), attack_range=200)
+        observer.team = ENEMY_TEAM
+        ally = create_actor((20, 10))
+        ally.team = ENEMY_TEAM
+
+        self.system.update([self.base, self.tower, observer, ally])
+
+        self.assertIsNone(observer.ai)
+        self.assertEqual(observer.actors_in_attack_range,
+                         {self.base, self.tower, ally})
+
+
+if __name__ == '__main__':
+    unittest.main()